@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from dataclasses import dataclass
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+@dataclass
+class AdmissionStats:
+    admitted: int = 0
+    shed_rate_limited: int = 0
+    shed_concurrency: int = 0
+    evicted_buckets: int = 0
+
+
+class TokenBuckets:
+    """Per-client token buckets.
+
+    Each bucket is a two-slot list [tokens, last_refill] in one dict, refilled
+    lazily on access, so an update is O(1). Buckets idle long enough to be full
+    again carry no state worth keeping and are evicted periodically.
+    """
+
+    def __init__(self, rate: float, burst: float, evict_every: float = 60.0):
+        self.rate = rate
+        self.burst = burst
+        self.evict_every = evict_every
+        self._buckets: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+        self._last_evict = time.monotonic()
+
+    def take(self, key: str) -> float:
+        """Consume one token; return 0 if admitted, else seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_evict >= self.evict_every:
+                self._evict(now)
+
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.burst, now]
+            else:
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+
+            if bucket[0] >= 1.0:
+                bucket[0] -= 1.0
+                return 0.0
+            return (1.0 - bucket[0]) / self.rate
+
+    def _evict(self, now: float) -> int:
+        full_after = self.burst / self.rate
+        idle = [k for k, (_, last) in self._buckets.items() if now - last >= full_after]
+        for k in idle:
+            del self._buckets[k]
+        self._last_evict = now
+        stats.evicted_buckets += len(idle)
+        return len(idle)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+stats = AdmissionStats()
+
+
+class AdmissionControlMiddleware:
+    """Shed write traffic early instead of queueing it in the threadpool.
+
+    Write requests are rate limited per device (X-Device-Id header, falling
+    back to the client address) and capped by a global in-flight limit;
+    rejected requests get a 429 with Retry-After.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        rate_per_second: float = 5.0,
+        burst: float = 20.0,
+        max_concurrent_writes: int = 8,
+    ):
+        self.app = app
+        self.buckets = TokenBuckets(rate=rate_per_second, burst=burst)
+        self.max_concurrent_writes = max_concurrent_writes
+        self._in_flight = 0
+
+    def _client_key(self, scope: Scope) -> str:
+        device = Headers(scope=scope).get("x-device-id")
+        if device:
+            return f"device:{device}"
+        client = scope.get("client")
+        return f"ip:{client[0]}" if client else "unknown"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        wait = self.buckets.take(self._client_key(scope))
+        if wait > 0:
+            stats.shed_rate_limited += 1
+            await _too_many(scope, receive, send, "Rate limit exceeded for this device", wait)
+            return
+
+        # Single event loop: the check-and-increment below cannot interleave.
+        if self._in_flight >= self.max_concurrent_writes:
+            stats.shed_concurrency += 1
+            await _too_many(scope, receive, send, "Server busy, retry shortly", 1.0)
+            return
+
+        self._in_flight += 1
+        stats.admitted += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self._in_flight -= 1
+
+
+async def _too_many(scope: Scope, receive: Receive, send: Send, detail: str, retry_after: float) -> None:
+    response = JSONResponse(
+        {"detail": detail},
+        status_code=429,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+    await response(scope, receive, send)
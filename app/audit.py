@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import enum
+import logging
+import os
+import queue
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any
+
+from fastapi import Header
+from sqlalchemy import Engine, insert, select
+from sqlalchemy.orm import Session
+
+from .db import engine
+from .models import AuditEvent
+
+logger = logging.getLogger(__name__)
+
+# Events buffered in memory are lost on a crash for at most this many seconds.
+AUDIT_FLUSH_SECONDS = float(os.environ.get("AUDIT_FLUSH_SECONDS", "1.0"))
+AUDIT_BATCH_SIZE = 500
+AUDIT_MAX_BUFFERED = 10_000
+# A batch whose write fails (e.g. "database is locked") is retried on later
+# flushes; it is only dropped, and counted, after this many failed writes.
+AUDIT_MAX_ATTEMPTS = int(os.environ.get("AUDIT_MAX_ATTEMPTS", "10"))
+
+
+def _to_text(value: Any) -> str | None:
+    if value is None:
+        return None
+    if isinstance(value, enum.Enum):
+        value = value.value
+    return str(value)
+
+
+def diff_changes(obj: Any, values: dict[str, Any]) -> list[tuple[str, str | None, str | None]]:
+    """(field, old, new) for every value that differs from what is currently on `obj`."""
+    changes = []
+    for field, new in values.items():
+        old = getattr(obj, field, None)
+        if old != new:
+            changes.append((field, _to_text(old), _to_text(new)))
+    return changes
+
+
+def get_actor(x_worker_id: str | None = Header(default=None)) -> str | None:
+    return x_worker_id
+
+
+class AuditJournal:
+    """In-process buffer of change events, drained in batches by a background thread.
+
+    The buffer is bounded; when it is full the caller writes its events
+    synchronously instead of dropping them. Batches that fail to write are
+    kept, oldest first, and retried before anything newer.
+    """
+
+    def __init__(self, engine: Engine, flush_seconds: float = AUDIT_FLUSH_SECONDS):
+        self._engine = engine
+        self._flush_seconds = flush_seconds
+        self._queue: queue.Queue[dict] = queue.Queue(maxsize=AUDIT_MAX_BUFFERED)
+        self._write_lock = threading.Lock()
+        # (failed attempts, events) of batches still to be written.
+        self._pending: deque[tuple[int, list[dict]]] = deque()
+        self._pending_lock = threading.Lock()
+        self.dropped = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def record(
+        self,
+        assessment_id: int,
+        entity: str,
+        changes: list[tuple[str, str | None, str | None]],
+        actor: str | None = None,
+    ) -> None:
+        now = datetime.utcnow()
+        overflow = []
+        for field, old, new in changes:
+            event = {
+                "assessment_id": assessment_id,
+                "entity": entity,
+                "field": field,
+                "old_value": old,
+                "new_value": new,
+                "actor": actor,
+                "changed_at": now,
+            }
+            try:
+                self._queue.put_nowait(event)
+            except queue.Full:
+                overflow.append(event)
+        if overflow:
+            self._write(overflow)
+
+    def _drain(self) -> list[dict]:
+        batch = []
+        while len(batch) < AUDIT_BATCH_SIZE:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, events: list[dict]) -> None:
+        with self._write_lock, self._engine.begin() as conn:
+            conn.execute(insert(AuditEvent), events)
+
+    def flush(self) -> None:
+        """Write pending and buffered events. On a failed write the batch is put back
+        in front of the pending ones and the error is raised."""
+        while True:
+            with self._pending_lock:
+                attempts, batch = self._pending.popleft() if self._pending else (0, self._drain())
+            if not batch:
+                return
+            try:
+                self._write(batch)
+            except Exception:
+                attempts += 1
+                if attempts >= AUDIT_MAX_ATTEMPTS:
+                    self.dropped += len(batch)
+                    logger.error("Dropping %d audit events after %d failed writes", len(batch), attempts)
+                else:
+                    with self._pending_lock:
+                        self._pending.appendleft((attempts, batch))
+                raise
+
+    def _flush_logged(self) -> None:
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Failed to flush audit events; will retry")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._flush_seconds):
+            self._flush_logged()
+        self._flush_logged()
+
+    def stats(self) -> dict:
+        with self._pending_lock:
+            pending = sum(len(batch) for _, batch in self._pending)
+        return {"buffered": self._queue.qsize(), "pending_retry": pending, "dropped": self.dropped}
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def history(self, db: Session, assessment_id: int) -> list[AuditEvent]:
+        # Make buffered events visible before reading.
+        self.flush()
+        stmt = select(AuditEvent).where(AuditEvent.assessment_id == assessment_id).order_by(AuditEvent.id)
+        return list(db.scalars(stmt))
+
+
+journal = AuditJournal(engine)
@@ -0,0 +1,298 @@
+"""Online, incremental backups of app.db and the uploads directory.
+
+    python -m app.backup create
+    python -m app.backup list
+    python -m app.backup verify <backup_id>
+    python -m app.backup restore <backup_id>      (stop the API first)
+
+The database is copied in one step with SQLite's backup API (app.db is in WAL
+mode, so writers keep going), cut into 1 MiB chunks and stored gzip-compressed
+under a content hash, so a new backup only writes chunks that changed since
+any earlier one. Upload files are immutable once written and are stored once
+per key. The files backed up are the recordings the copied database
+references, so the two always agree. Each backup's manifest lists the chunks
+and files it needs.
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from .db import BASE_DIR, DB_PATH
+from .snapshot import backup_sqlite
+from .storage import store
+
+logger = logging.getLogger(__name__)
+
+BACKUP_DIR = Path(os.environ.get("BACKUP_DIR", BASE_DIR / "backups"))
+CHUNK_SIZE = 1024 * 1024
+
+_lock = threading.Lock()
+
+
+class BackupError(RuntimeError):
+    pass
+
+
+def _chunk_path(digest: str) -> Path:
+    return BACKUP_DIR / "chunks" / digest[:2] / f"{digest}.gz"
+
+
+def _file_path(key: str) -> Path:
+    return BACKUP_DIR / "files" / key
+
+
+def _manifest_path(backup_id: str) -> Path:
+    return BACKUP_DIR / "manifests" / f"{backup_id}.json"
+
+
+def _hash_file(path: Path) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    with path.open("rb") as f:
+        while block := f.read(CHUNK_SIZE):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def list_backups() -> list[dict]:
+    manifests = sorted((BACKUP_DIR / "manifests").glob("*.json")) if (BACKUP_DIR / "manifests").exists() else []
+    out = []
+    for path in manifests:
+        m = json.loads(path.read_text(encoding="utf-8"))
+        out.append({k: m[k] for k in ("id", "created_at", "db_size", "chunks_written", "files_written", "timings")})
+    return out
+
+
+def _latest_files() -> dict[str, dict]:
+    """Upload entries from the newest manifest, used to skip re-hashing unchanged files."""
+    backups = list_backups()
+    if not backups:
+        return {}
+    m = json.loads(_manifest_path(backups[-1]["id"]).read_text(encoding="utf-8"))
+    return {f["key"]: f for f in m["files"]}
+
+
+def _referenced_keys(db_copy: Path) -> list[str]:
+    """Upload keys the copied database points at, in store-relative form."""
+    conn = sqlite3.connect(db_copy)
+    try:
+        rows = conn.execute(
+            "SELECT DISTINCT audio_path FROM speech_language WHERE audio_path IS NOT NULL ORDER BY audio_path"
+        ).fetchall()
+    finally:
+        conn.close()
+    keys = []
+    for (audio_path,) in rows:
+        path = store.resolve(audio_path)
+        try:
+            keys.append(path.relative_to(store.root).as_posix())
+        except ValueError:
+            logger.warning("Not backing up %s: outside %s", path, store.root)
+    return keys
+
+
+def create_backup() -> dict:
+    if not _lock.acquire(blocking=False):
+        raise BackupError("A backup is already running")
+    try:
+        return _create_backup()
+    finally:
+        _lock.release()
+
+
+def _create_backup() -> dict:
+    backup_id = datetime.utcnow().strftime("%Y%m%dT%H%M%S%fZ")
+    timings: dict[str, float] = {}
+    work = BACKUP_DIR / "tmp"
+    work.mkdir(parents=True, exist_ok=True)
+    copy = work / f"{backup_id}.db"
+
+    t = time.perf_counter()
+    backup_sqlite(DB_PATH, copy)
+    keys = _referenced_keys(copy)
+    timings["db_snapshot_s"] = round(time.perf_counter() - t, 3)
+
+    t = time.perf_counter()
+    chunks: list[str] = []
+    chunks_written = 0
+    whole = hashlib.sha256()
+    with copy.open("rb") as f:
+        while block := f.read(CHUNK_SIZE):
+            whole.update(block)
+            digest = hashlib.blake2b(block, digest_size=20).hexdigest()
+            chunks.append(digest)
+            path = _chunk_path(digest)
+            if not path.exists():
+                _write_atomic(path, gzip.compress(block, compresslevel=1))
+                chunks_written += 1
+    db_size = copy.stat().st_size
+    copy.unlink()
+    timings["db_chunks_s"] = round(time.perf_counter() - t, 3)
+
+    t = time.perf_counter()
+    previous = _latest_files()
+    files = []
+    files_written = 0
+    missing: list[str] = []
+    for key in keys:
+        path = store.resolve(key)
+        target = _file_path(key)
+        prev = previous.get(key)
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            # Transcoded or swept since the DB copy; an earlier backup may still hold it.
+            if prev and target.exists():
+                files.append(prev)
+            else:
+                missing.append(key)
+            continue
+        if prev and prev["size"] == st.st_size and prev["mtime_ns"] == st.st_mtime_ns:
+            digest = prev["hash"]
+        else:
+            digest = _hash_file(path)
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(path, target)
+            files_written += 1
+        files.append({"key": key, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": digest})
+    if missing:
+        logger.error("%d referenced recordings were not on disk: %s", len(missing), ", ".join(missing[:20]))
+    timings["uploads_s"] = round(time.perf_counter() - t, 3)
+
+    manifest = {
+        "id": backup_id,
+        "created_at": datetime.utcnow().isoformat(),
+        "db_size": db_size,
+        "db_sha256": whole.hexdigest(),
+        "chunk_size": CHUNK_SIZE,
+        "chunks": chunks,
+        "chunks_written": chunks_written,
+        "files": files,
+        "files_written": files_written,
+        "files_missing": missing,
+        "timings": timings,
+    }
+    _write_atomic(_manifest_path(backup_id), json.dumps(manifest).encode())
+    return manifest
+
+
+def _load_manifest(backup_id: str) -> dict:
+    path = _manifest_path(backup_id)
+    if not path.exists():
+        raise BackupError(f"Backup {backup_id} not found")
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _assemble_db(manifest: dict, dst: Path) -> None:
+    whole = hashlib.sha256()
+    with dst.open("wb") as out:
+        for digest in manifest["chunks"]:
+            path = _chunk_path(digest)
+            if not path.exists():
+                raise BackupError(f"Missing chunk {digest}")
+            block = gzip.decompress(path.read_bytes())
+            if hashlib.blake2b(block, digest_size=20).hexdigest() != digest:
+                raise BackupError(f"Corrupt chunk {digest}")
+            whole.update(block)
+            out.write(block)
+    if whole.hexdigest() != manifest["db_sha256"]:
+        raise BackupError("Reassembled database does not match the recorded checksum")
+
+    conn = sqlite3.connect(dst)
+    try:
+        result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+    finally:
+        conn.close()
+    if result != "ok":
+        raise BackupError(f"SQLite integrity check failed: {result}")
+
+
+def verify_backup(backup_id: str) -> dict:
+    manifest = _load_manifest(backup_id)
+    t = time.perf_counter()
+    work = BACKUP_DIR / "tmp"
+    work.mkdir(parents=True, exist_ok=True)
+    dst = work / f"verify_{backup_id}.db"
+    try:
+        _assemble_db(manifest, dst)
+    finally:
+        dst.unlink(missing_ok=True)
+    for f in manifest["files"]:
+        path = _file_path(f["key"])
+        if not path.exists() or _hash_file(path) != f["hash"]:
+            raise BackupError(f"Upload {f['key']} is missing or corrupt in the backup")
+    return {"id": backup_id, "ok": True, "verify_s": round(time.perf_counter() - t, 3)}
+
+
+def restore_backup(backup_id: str, db_path: Path = DB_PATH) -> dict:
+    """Rebuild app.db and uploads from a backup. The API must not be running."""
+    manifest = _load_manifest(backup_id)
+    t = time.perf_counter()
+
+    staged = db_path.with_suffix(".restore.tmp")
+    try:
+        _assemble_db(manifest, staged)
+    except BaseException:
+        staged.unlink(missing_ok=True)
+        raise
+    for suffix in ("-wal", "-shm"):
+        Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+    os.replace(staged, db_path)
+
+    restored = 0
+    for f in manifest["files"]:
+        src = _file_path(f["key"])
+        dst = store.resolve(f["key"])
+        if dst.exists() and dst.stat().st_size == f["size"] and _hash_file(dst) == f["hash"]:
+            continue
+        if _hash_file(src) != f["hash"]:
+            raise BackupError(f"Upload {f['key']} is corrupt in the backup")
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(src, dst)
+        restored += 1
+
+    return {"id": backup_id, "files_restored": restored, "restore_s": round(time.perf_counter() - t, 3)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.backup")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("create")
+    sub.add_parser("list")
+    for name in ("verify", "restore"):
+        p = sub.add_parser(name)
+        p.add_argument("backup_id")
+    args = parser.parse_args()
+
+    if args.command == "create":
+        result = create_backup()
+        result = {k: v for k, v in result.items() if k not in ("chunks", "files")}
+    elif args.command == "list":
+        result = list_backups()
+    elif args.command == "verify":
+        result = verify_backup(args.backup_id)
+    else:
+        result = restore_backup(args.backup_id)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
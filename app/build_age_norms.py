@@ -0,0 +1,122 @@
+"""Derive age-band thresholds from completed assessments and write them as a new
+rule set: a copy of the base rule set with "age_bands" added.
+
+Only risk_below/high_from are derived (score percentiles per band). Scores
+alone say nothing about how much each domain should count, so per-band
+"weights" are left to be set by hand; without them the base weights apply.
+
+Run offline (not from the API), then activate the new version:
+    python -m app.build_age_norms [--base default-v1] [--version default-v1-age]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from collections import defaultdict
+
+from sqlalchemy import select
+
+from .db import SessionLocal
+from .models import Assessment, AssessmentStatus, Child
+from .rules import RULESETS_DIR, compile_ruleset, registry
+from .scoring import DOMAINS
+
+AGE_BANDS = [
+    ("0-23m", 0, 23),
+    ("24-35m", 24, 35),
+    ("36-47m", 36, 47),
+    ("48-59m", 48, 59),
+    ("60-72m", 60, 72),
+]
+
+# Bands with fewer completed assessments than this keep the standard thresholds.
+MIN_SAMPLES = 30
+
+
+def _percentile(sorted_values: list[int], pct: float) -> int:
+    idx = min(len(sorted_values) - 1, max(0, int(round(pct * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+def _band_for(age_months: int) -> str | None:
+    for name, lo, hi in AGE_BANDS:
+        if lo <= age_months <= hi:
+            return name
+    return None
+
+
+def build_age_bands(base: dict) -> list[dict]:
+    scores: dict[str, dict[str, list[int]]] = defaultdict(lambda: defaultdict(list))
+
+    db = SessionLocal()
+    try:
+        stmt = (
+            select(
+                Child.age_months,
+                Assessment.vision_score,
+                Assessment.hearing_score,
+                Assessment.speech_score,
+                Assessment.motor_score,
+                Assessment.cognitive_score,
+            )
+            .join(Child, Child.id == Assessment.child_id)
+            .where(Assessment.status == AssessmentStatus.completed)
+            .execution_options(yield_per=1000)
+        )
+        for age, *values in db.execute(stmt):
+            band = _band_for(age)
+            if band is None:
+                continue
+            for domain, value in zip(DOMAINS, values):
+                if value is not None:
+                    scores[band][domain].append(value)
+    finally:
+        db.close()
+
+    defaults = {d["name"]: d for d in base["domains"]}
+    bands = []
+    for name, lo, hi in AGE_BANDS:
+        risk = {d: defaults[d].get("risk_below", 60) for d in DOMAINS}
+        # Only domains that can flag high potential in the base rule set get a cut-off.
+        high = {d: defaults[d]["high_from"] for d in DOMAINS if defaults[d].get("high_from") is not None}
+        samples = 0
+        for domain in DOMAINS:
+            values = sorted(scores[name][domain])
+            samples = max(samples, len(values))
+            if len(values) < MIN_SAMPLES:
+                continue
+            # Bottom decile flags risk, top decile flags high potential; bounded so a
+            # skewed population cannot drift the cut-offs too far from the standard ones.
+            risk[domain] = max(40, min(70, _percentile(values, 0.10)))
+            if domain in high:
+                high[domain] = max(75, min(95, _percentile(values, 0.90)))
+        bands.append(
+            {
+                "band": name,
+                "min_months": lo,
+                "max_months": hi,
+                "samples": samples,
+                "risk_below": risk,
+                "high_from": high,
+            }
+        )
+    return bands
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.build_age_norms")
+    parser.add_argument("--base", default=registry.get().version, help="rule set to copy (default: active)")
+    parser.add_argument("--version", help="new rule-set version (default: <base>-age)")
+    args = parser.parse_args()
+
+    base_path = RULESETS_DIR / f"{args.base}.json"
+    base = json.loads(base_path.read_text(encoding="utf-8"))
+    ruleset = {**base, "version": args.version or f"{args.base}-age", "age_bands": build_age_bands(base)}
+    compile_ruleset(ruleset)  # fail before writing an invalid file
+    path = RULESETS_DIR / f"{ruleset['version']}.json"
+    path.write_text(json.dumps(ruleset, indent=2) + "\n", encoding="utf-8")
+    print(f"Wrote {len(ruleset['age_bands'])} age bands to {path}; activate it via /api/v1/admin/rulesets")
+
+
+if __name__ == "__main__":
+    main()
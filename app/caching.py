@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts: object) -> str:
+    digest = hashlib.blake2b("|".join(str(p) for p in parts).encode(), digest_size=8).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _as_utc(dt: datetime) -> datetime:
+    # Timestamps are stored as naive UTC (datetime.utcnow).
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: datetime | None = None,
+) -> Response | None:
+    """Set validators on `response`; return a 304 if the client's copy is still current."""
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+
+    fresh = False
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {t.strip() for t in if_none_match.split(",")}
+        fresh = "*" in tags or etag in tags or etag.removeprefix("W/") in tags
+    elif last_modified is not None and "if-modified-since" in request.headers:
+        try:
+            since = parsedate_to_datetime(request.headers["if-modified-since"])
+            fresh = _as_utc(last_modified).replace(microsecond=0) <= since
+        except (TypeError, ValueError):
+            fresh = False
+
+    if fresh:
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return None
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import os
+import time
 from pathlib import Path
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from fastapi import Header
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 DB_PATH = BASE_DIR / "app.db"
@@ -14,12 +18,80 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
 )
 
+
+
+@event.listens_for(engine, "connect")
+def _enable_wal(dbapi_conn, _record):
+    # WAL lets the snapshot refresher and backups copy app.db while API writes continue.
+    dbapi_conn.execute("PRAGMA journal_mode=WAL")
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# ---- Read path for reports, exports, analytics and lists ----
+# Either an external replica (READ_DB_URL) or a read-only SQLite snapshot of
+# app.db that app.snapshot refreshes with a single-step online backup.
+READ_DB_URL = os.environ.get("READ_DB_URL")
+SNAPSHOT_PATH = BASE_DIR / "app.snapshot.db"
+SNAPSHOT_REFRESH_SECONDS = float(os.environ.get("SNAPSHOT_REFRESH_SECONDS", "30"))
+# Snapshot reads fall back to the primary once the snapshot is older than this.
+SNAPSHOT_MAX_STALENESS_SECONDS = float(os.environ.get("SNAPSHOT_MAX_STALENESS_SECONDS", "120"))
+# Comma-separated endpoint names that should read from the primary anyway.
+READ_PRIMARY_ENDPOINTS = {e.strip() for e in os.environ.get("READ_PRIMARY_ENDPOINTS", "").split(",") if e.strip()}
+
+# NullPool: every session opens the current snapshot file rather than one replaced since.
+read_engine = create_engine(
+    READ_DB_URL or f"sqlite:///file:{SNAPSHOT_PATH}?mode=ro&uri=true",
+    connect_args={} if READ_DB_URL else {"check_same_thread": False},
+    poolclass=NullPool,
+)
+
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
 
-def get_db():
-    db = SessionLocal()
+def read_replica_fresh() -> bool:
+    if READ_DB_URL:
+        return True
+    try:
+        age = time.time() - SNAPSHOT_PATH.stat().st_mtime
+    except FileNotFoundError:
+        return False
+    return age <= SNAPSHOT_MAX_STALENESS_SECONDS
+
+
+def switch_to_primary(db: Session) -> bool:
+    """Re-point a replica/snapshot session at app.db, for rows written after the last
+    refresh. Returns False if the session already reads the primary."""
+    if db.get_bind() is engine:
+        return False
+    db.close()
+    db.bind = engine
+    return True
+
+
+def _open_session(factory: sessionmaker, center_id: int | None):
+    db = factory()
+    db.info["center_id"] = center_id
+    return db
+
+
+def get_db(x_center_id: int | None = Header(default=None)):
+    db = _open_session(SessionLocal, x_center_id)
     try:
         yield db
     finally:
         db.close()
+
+
+def read_db(endpoint: str):
+    """Dependency factory for read-only endpoints routed to the replica/snapshot."""
+
+    def get_read_db(x_center_id: int | None = Header(default=None)):
+        use_primary = endpoint in READ_PRIMARY_ENDPOINTS or not read_replica_fresh()
+        db = _open_session(SessionLocal if use_primary else ReadSessionLocal, x_center_id)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    return get_read_db
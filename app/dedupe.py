@@ -0,0 +1,209 @@
+"""Duplicate-child detection using blocking keys.
+
+Batch job (prints candidate pairs as CSV):  python -m app.dedupe
+"""
+from __future__ import annotations
+
+import csv
+import logging
+import re
+import sys
+from collections import deque
+from typing import Iterator
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from .db import SessionLocal
+from .models import Child
+
+logger = logging.getLogger(__name__)
+
+AGE_WINDOW_MONTHS = 6
+MAX_CANDIDATES = 10
+# Pairs are only generated inside blocks up to this size (within the age window).
+MAX_BLOCK_SIZE = 50
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+def _soundex(word: str) -> str:
+    out = word[0].upper()
+    prev = _SOUNDEX_CODES.get(word[0], "")
+    for ch in word[1:]:
+        code = _SOUNDEX_CODES.get(ch, "")
+        if code and code != prev:
+            out += code
+            if len(out) == 4:
+                break
+        if ch not in "hw":
+            prev = code
+    return out.ljust(4, "0")
+
+
+def phonetic_key(name: str | None) -> str | None:
+    """Soundex of the first and last name tokens ("L250:D100"), so spelling variants
+    (Lakshmi/Laxmi Devi) share a key but a common first name alone does not."""
+    tokens = re.findall(r"[a-z]+", (name or "").lower())
+    if not tokens:
+        return None
+    last = _soundex(tokens[-1]) if len(tokens) > 1 else ""
+    return f"{_soundex(tokens[0])}:{last}"
+
+
+def normalize_phone(phone: str | None) -> str | None:
+    digits = re.sub(r"\D", "", phone or "")
+    # Compare on the subscriber number so +91/0 prefixes do not matter.
+    return digits[-10:] if len(digits) >= 6 else None
+
+
+def normalize_name(name: str | None) -> str:
+    return " ".join(re.findall(r"[a-z]+", (name or "").lower()))
+
+
+def is_strong_match(child: Child, *, name: str, guardian_name: str | None, guardian_phone: str | None) -> bool:
+    """Same full name plus the same phone or guardian: safe to merge without asking."""
+    if normalize_name(child.name) != normalize_name(name):
+        return False
+    pk = normalize_phone(guardian_phone)
+    if pk is not None and child.phone_key == pk:
+        return True
+    guardian = normalize_name(guardian_name)
+    return bool(guardian) and normalize_name(child.guardian_name) == guardian
+
+
+def apply_blocking_keys(child: Child) -> None:
+    child.name_key = phonetic_key(child.name)
+    child.phone_key = normalize_phone(child.guardian_phone)
+
+
+def find_duplicate_candidates(
+    db: Session,
+    *,
+    name: str,
+    age_months: int,
+    guardian_phone: str | None,
+    exclude_id: int | None = None,
+) -> list[Child]:
+    """Existing children sharing a blocking key with the given details, within the age
+    window; children matching on both keys come first, then the closest in age."""
+    lo, hi = age_months - AGE_WINDOW_MONTHS, age_months + AGE_WINDOW_MONTHS
+    closest = func.abs(Child.age_months - age_months)
+    found: dict[int, Child] = {}
+
+    nk = phonetic_key(name)
+    if nk:
+        stmt = (
+            select(Child)
+            .where(Child.name_key == nk, Child.age_months.between(lo, hi))
+            .order_by(closest, Child.id)
+            .limit(MAX_CANDIDATES)
+        )
+        for c in db.scalars(stmt):
+            found[c.id] = c
+
+    pk = normalize_phone(guardian_phone)
+    if pk:
+        stmt = (
+            select(Child)
+            .where(Child.phone_key == pk, Child.age_months.between(lo, hi))
+            .order_by(closest, Child.id)
+            .limit(MAX_CANDIDATES)
+        )
+        for c in db.scalars(stmt):
+            found.setdefault(c.id, c)
+
+    found.pop(exclude_id, None)
+    ranked = sorted(
+        found.values(),
+        key=lambda c: (not (nk and pk and c.name_key == nk and c.phone_key == pk), abs(c.age_months - age_months), c.id),
+    )
+    return ranked[:MAX_CANDIDATES]
+
+
+def backfill_blocking_keys(db: Session, batch_size: int = 1000) -> int:
+    updated = 0
+    last_id = 0
+    while True:
+        batch = db.scalars(
+            select(Child)
+            # Keys without ":" predate surname blocking and are recomputed.
+            .where(
+                or_(Child.name_key.is_(None), Child.name_key.not_like("%:%")),
+                Child.merged_into_id.is_(None),
+                Child.id > last_id,
+            )
+            .order_by(Child.id)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            return updated
+        last_id = batch[-1].id
+        for c in batch:
+            apply_blocking_keys(c)
+        db.commit()
+        updated += len(batch)
+
+
+def find_duplicate_pairs(db: Session, window: int = AGE_WINDOW_MONTHS) -> Iterator[tuple[int, int, str]]:
+    """Sort-merge pass over children: rows are streamed ordered by (key, age) and only
+    compared to neighbours in the same key run within `window` months.
+
+    A run holding more than MAX_BLOCK_SIZE children at once is too generic to
+    pair exhaustively; its extra rows are skipped and the key is logged.
+    """
+    for key_col, reason in ((Child.name_key, "name"), (Child.phone_key, "phone")):
+        stmt = (
+            select(Child.id, key_col, Child.age_months)
+            .where(key_col.is_not(None))
+            .order_by(key_col, Child.age_months, Child.id)
+            .execution_options(yield_per=5000)
+        )
+        run_key = None
+        run: deque[tuple[int, int]] = deque()
+        skipped = 0
+        for child_id, key, age in db.execute(stmt):
+            if key != run_key:
+                if skipped:
+                    logger.warning("Skipped %d children in oversized %s block %s", skipped, reason, run_key)
+                run.clear()
+                run_key = key
+                skipped = 0
+            while run and age - run[0][0] > window:
+                run.popleft()
+            if len(run) >= MAX_BLOCK_SIZE:
+                skipped += 1
+                continue
+            for _, other_id in run:
+                yield other_id, child_id, reason
+            run.append((age, child_id))
+        if skipped:
+            logger.warning("Skipped %d children in oversized %s block %s", skipped, reason, run_key)
+
+
+def main() -> None:
+    # Imported here: init_db -> search -> dedupe would otherwise be circular.
+    from .init_db import init_db
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stderr)
+    init_db()
+    db = SessionLocal()
+    try:
+        backfill_blocking_keys(db)
+        writer = csv.writer(sys.stdout)
+        writer.writerow(["child_id_a", "child_id_b", "matched_on"])
+        for row in find_duplicate_pairs(db):
+            writer.writerow(row)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
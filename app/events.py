@@ -0,0 +1,115 @@
+"""In-process pub/sub for assessment completion events (served as SSE).
+
+Publishers run in worker threads (sync endpoints); each subscriber is an
+asyncio queue on the event loop. Subscribers are indexed by center so a
+publish only touches the dashboards that can match it. Queues are bounded:
+a client that falls behind loses its oldest events and is told how many it
+missed, so it can refetch instead of holding memory for everyone.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+
+SSE_QUEUE_SIZE = int(os.environ.get("SSE_QUEUE_SIZE", "100"))
+SSE_MAX_SUBSCRIBERS = int(os.environ.get("SSE_MAX_SUBSCRIBERS", "10000"))
+SSE_HEARTBEAT_SECONDS = float(os.environ.get("SSE_HEARTBEAT_SECONDS", "15"))
+# Recent events kept for clients reconnecting with Last-Event-ID.
+SSE_REPLAY_SIZE = 1000
+
+
+class TooManySubscribers(RuntimeError):
+    pass
+
+
+@dataclass(eq=False)
+class Subscriber:
+    loop: asyncio.AbstractEventLoop
+    center_id: int | None
+    classifications: frozenset[str] | None
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=SSE_QUEUE_SIZE))
+    dropped: int = 0
+
+    def wants(self, event: dict) -> bool:
+        return self.classifications is None or event["classification"] in self.classifications
+
+    def offer(self, item: tuple[int, dict]) -> None:
+        # Runs on the subscriber's loop.
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(item)
+
+
+class CompletionBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # center_id -> subscribers; None holds the all-centers subscribers.
+        self._by_center: dict[int | None, set[Subscriber]] = {}
+        self._count = 0
+        self._ids = itertools.count(1)
+        self._recent: deque[tuple[int, dict]] = deque(maxlen=SSE_REPLAY_SIZE)
+
+    def subscribe(
+        self,
+        center_id: int | None = None,
+        classifications: frozenset[str] | None = None,
+        last_event_id: int | None = None,
+    ) -> Subscriber:
+        sub = Subscriber(asyncio.get_running_loop(), center_id, classifications)
+        with self._lock:
+            if self._count >= SSE_MAX_SUBSCRIBERS:
+                raise TooManySubscribers()
+            self._by_center.setdefault(center_id, set()).add(sub)
+            self._count += 1
+            backlog = [e for e in self._recent if last_event_id is not None and e[0] > last_event_id]
+        for event_id, event in backlog:
+            if self._matches(sub, event):
+                sub.offer((event_id, event))
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        with self._lock:
+            subs = self._by_center.get(sub.center_id)
+            if subs is not None and sub in subs:
+                subs.discard(sub)
+                self._count -= 1
+                if not subs:
+                    del self._by_center[sub.center_id]
+
+    @staticmethod
+    def _matches(sub: Subscriber, event: dict) -> bool:
+        return (sub.center_id is None or sub.center_id == event["center_id"]) and sub.wants(event)
+
+    def publish(self, event: dict) -> int:
+        """Fan `event` out to matching subscribers; safe to call from any thread."""
+        with self._lock:
+            item = (next(self._ids), event)
+            self._recent.append(item)
+            targets = list(self._by_center.get(None, ()))
+            if event["center_id"] is not None:
+                targets.extend(self._by_center.get(event["center_id"], ()))
+        delivered = 0
+        for sub in targets:
+            if sub.wants(event):
+                try:
+                    sub.loop.call_soon_threadsafe(sub.offer, item)
+                except RuntimeError:
+                    continue  # loop closed; the stream's finally will unsubscribe
+                delivered += 1
+        return delivered
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "subscribers": self._count,
+                "centers": sum(1 for c in self._by_center if c is not None),
+                "last_event_id": self._recent[-1][0] if self._recent else 0,
+            }
+
+
+completions = CompletionBroker()
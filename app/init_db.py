@@ -1,7 +1,21 @@
+from sqlalchemy import inspect
+
 from .db import engine
 from .models import Base
+from .search import init_search_index
+from .sync import init_change_log
 import app.models
 
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    # create_all skips tables that already exist; add indexes declared since
+    # (those on columns an old database lacks wait until the column is added).
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        present = {c["name"] for c in inspector.get_columns(table.name)}
+        for index in table.indexes:
+            if {c.name for c in index.columns} <= present:
+                index.create(bind=engine, checkfirst=True)
+    init_search_index(engine)
+    init_change_log(engine)
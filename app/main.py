@@ -1,11 +1,26 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .routers import children, assessments
+from .admission import AdmissionControlMiddleware
+from .audit import journal
+from .db import ReadSessionLocal, SessionLocal
+from .compression import CompressionMiddleware
+from .reports import shutdown_pool
+from .snapshot import refresher
+from .storage import transcoder
+from . import tenancy
+from .routers import admin, centers, children, assessments, events, sync, triage
 from .init_db import init_db
 
 app = FastAPI(title="Anganwadi Early Screening API", version="0.1.0")
 
+tenancy.install(SessionLocal, ReadSessionLocal)
+
+# Middleware added later wraps earlier ones. Admission control sheds writes
+# before any work is done, but sits inside CORS so 429s carry CORS headers.
+app.add_middleware(AdmissionControlMiddleware, rate_per_second=5.0, burst=20.0, max_concurrent_writes=8)
+app.add_middleware(CompressionMiddleware, minimum_size=1000)
+
 # ✅ CORS MUST COME BEFORE ROUTERS
 app.add_middleware(
     CORSMiddleware,
@@ -13,16 +28,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
 )
 
 # ✅ Routers AFTER middleware
+app.include_router(centers.router, prefix="/api/v1")
 app.include_router(children.router, prefix="/api/v1")
 app.include_router(assessments.router, prefix="/api/v1")
+app.include_router(sync.router, prefix="/api/v1")
+app.include_router(events.router, prefix="/api/v1")
+app.include_router(triage.router, prefix="/api/v1")
+app.include_router(admin.router, prefix="/api/v1")
 
 
 @app.on_event("startup")
 def startup():
     init_db()
+    journal.start()
+    transcoder.start()
+    refresher.start()
+
+
+@app.on_event("shutdown")
+def shutdown():
+    refresher.stop()
+    transcoder.stop()
+    journal.stop()
+    shutdown_pool()
 
 
 @app.get("/health")
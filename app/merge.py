@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from typing import Callable
+
+from sqlalchemy import bindparam, func, insert, select
+from sqlalchemy.orm import Session
+
+from .models import Assessment, Child, ChildMerge, TriageItem
+
+# Called with {loser_id: winner_id} after a merge commits, so derived
+# aggregates and caches keyed by child can drop stale entries.
+merge_listeners: list[Callable[[dict[int, int]], None]] = []
+
+_CHUNK = 500
+
+
+class MergeError(ValueError):
+    pass
+
+
+def _resolve_pairs(pairs: list[tuple[int, int]]) -> dict[int, int]:
+    """Map every loser to its final winner, so chains like A->B, B->C collapse to A->C, B->C."""
+    target: dict[int, int] = {}
+    for winner, loser in pairs:
+        if winner == loser:
+            raise MergeError(f"Cannot merge child {loser} into itself")
+        if loser in target and target[loser] != winner:
+            raise MergeError(f"Child {loser} is merged into more than one child")
+        target[loser] = winner
+
+    resolved: dict[int, int] = {}
+    for loser in target:
+        seen = {loser}
+        winner = target[loser]
+        while winner in target:
+            if winner in seen:
+                raise MergeError(f"Merge pairs form a cycle through child {winner}")
+            seen.add(winner)
+            winner = target[winner]
+        resolved[loser] = winner
+    return resolved
+
+
+def _chunks(items: list[int]):
+    for i in range(0, len(items), _CHUNK):
+        yield items[i : i + _CHUNK]
+
+
+def resolve_child(db: Session, child_id: int) -> Child | None:
+    """The child with this id, or the child it was merged into (offline devices may still
+    hold a merged child's id)."""
+    child = db.get(Child, child_id)
+    if child is not None and child.merged_into_id is not None:
+        child = db.get(Child, child.merged_into_id)
+    return child
+
+
+def merge_children(db: Session, pairs: list[tuple[int, int]]) -> tuple[int, int]:
+    """Merge (winner_id, loser_id) pairs in one transaction.
+
+    Assessments and triage entries are re-parented with set-based UPDATEs;
+    screening and recommendation rows hang off assessment_id and move with them.
+    Losers are kept with merged_into_id set. Returns (children merged, assessments moved).
+    """
+    mapping = _resolve_pairs(pairs)
+    if not mapping:
+        return 0, 0
+
+    ids = sorted(set(mapping) | set(mapping.values()))
+    existing: dict[int, tuple[str, str | None]] = {}
+    centers: dict[int, int | None] = {}
+    already_merged: list[int] = []
+    for chunk in _chunks(ids):
+        for cid, name, phone, center_id, merged_into in db.execute(
+            select(Child.id, Child.name, Child.guardian_phone, Child.center_id, Child.merged_into_id).where(
+                Child.id.in_(chunk)
+            )
+        ):
+            existing[cid] = (name, phone)
+            centers[cid] = center_id
+            if merged_into is not None:
+                already_merged.append(cid)
+    missing = [cid for cid in ids if cid not in existing]
+    if missing:
+        raise MergeError(f"Children not found: {missing[:20]}")
+    if already_merged:
+        raise MergeError(f"Children already merged: {already_merged[:20]}")
+    # Moved assessments and triage entries keep their center; it must be the winner's.
+    cross_center = [loser for loser, winner in mapping.items() if centers[loser] != centers[winner]]
+    if cross_center:
+        raise MergeError(f"Children belong to a different center than their winner: {cross_center[:20]}")
+
+    losers = sorted(mapping)
+    moved_by_loser: dict[int, int] = {}
+    for chunk in _chunks(losers):
+        for cid, n in db.execute(
+            select(Assessment.child_id, func.count()).where(Assessment.child_id.in_(chunk)).group_by(Assessment.child_id)
+        ):
+            moved_by_loser[cid] = n
+
+    reparent = [{"loser_id": loser, "winner_id": winner} for loser, winner in mapping.items()]
+    # Tables that carry child_id next to assessment_id move together.
+    for table in (Assessment.__table__, TriageItem.__table__):
+        db.execute(
+            table.update().where(table.c.child_id == bindparam("loser_id")).values(child_id=bindparam("winner_id")),
+            reparent,
+        )
+    db.execute(
+        insert(ChildMerge),
+        [
+            {
+                "winner_child_id": winner,
+                "loser_child_id": loser,
+                "loser_name": existing[loser][0],
+                "loser_guardian_phone": existing[loser][1],
+                "assessments_moved": moved_by_loser.get(loser, 0),
+            }
+            for loser, winner in mapping.items()
+        ],
+    )
+    children = Child.__table__
+    # Losers become tombstones rather than being deleted: SQLite would hand a deleted
+    # id to the next registration. Earlier tombstones follow their loser to the winner,
+    # and clearing the blocking keys keeps tombstones out of duplicate detection.
+    db.execute(
+        children.update()
+        .where(children.c.merged_into_id == bindparam("loser_id"))
+        .values(merged_into_id=bindparam("winner_id")),
+        reparent,
+    )
+    db.execute(
+        children.update()
+        .where(children.c.id == bindparam("loser_id"))
+        .values(merged_into_id=bindparam("winner_id"), name_key=None, phone_key=None),
+        reparent,
+    )
+
+    db.commit()
+    db.expire_all()
+
+    for listener in merge_listeners:
+        listener(mapping)
+
+    return len(mapping), sum(moved_by_loser.values())
@@ -3,7 +3,7 @@ from __future__ import annotations
 import enum
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, Enum, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, DateTime, Enum, Float, ForeignKey, Index, Integer, String, Text, text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -37,12 +37,32 @@ class RecommendationType(str, enum.Enum):
     referral = "referral"
 
 
+class TriageStatus(str, enum.Enum):
+    open = "open"
+    claimed = "claimed"
+    resolved = "resolved"
+
+
+# ================= CENTER =================
+
+class Center(Base):
+    __tablename__ = "centers"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(200))
+    district: Mapped[str] = mapped_column(String(100), index=True)
+
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+
+
 # ================= CHILD =================
 
 class Child(Base):
     __tablename__ = "children"
 
     id: Mapped[int] = mapped_column(primary_key=True)
+    # Tenant key; queries are scoped to it per request (see app/tenancy.py).
+    center_id: Mapped[int | None] = mapped_column(ForeignKey("centers.id"))
     name: Mapped[str] = mapped_column(String(200))
     age_months: Mapped[int]
 
@@ -50,6 +70,12 @@ class Child(Base):
     guardian_phone: Mapped[str | None]
     consent_obtained: Mapped[bool] = mapped_column(default=False)
 
+    # Blocking keys for duplicate detection (see app/dedupe.py).
+    name_key: Mapped[str | None] = mapped_column(String(16))
+    phone_key: Mapped[str | None] = mapped_column(String(16), index=True)
+    # Set when merged into another child; the row stays so its id is never reused.
+    merged_into_id: Mapped[int | None] = mapped_column(ForeignKey("children.id"), index=True)
+
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -58,6 +84,12 @@ class Child(Base):
         cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        Index("ix_children_name_key_age", "name_key", "age_months"),
+        Index("ix_children_center_created", "center_id", "created_at"),
+        Index("ix_children_center_name_key_age", "center_id", "name_key", "age_months"),
+    )
+
 
 # ================= ASSESSMENT =================
 
@@ -65,7 +97,8 @@ class Assessment(Base):
     __tablename__ = "assessments"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    child_id: Mapped[int] = mapped_column(ForeignKey("children.id"))
+    child_id: Mapped[int] = mapped_column(ForeignKey("children.id"), index=True)
+    center_id: Mapped[int | None] = mapped_column(ForeignKey("centers.id"))
 
     status: Mapped[AssessmentStatus] = mapped_column(
         Enum(AssessmentStatus),
@@ -83,6 +116,8 @@ class Assessment(Base):
 
     total_duration_minutes: Mapped[int | None]
     followup_months: Mapped[int | None]
+    # Version of the scoring rule set (app/rulesets) used at completion.
+    ruleset_version: Mapped[str | None] = mapped_column(String(50))
 
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -102,6 +137,11 @@ class Assessment(Base):
         cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        Index("ix_assessments_center_child", "center_id", "child_id"),
+        Index("ix_assessments_center_status_completed", "center_id", "status", "completed_at"),
+    )
+
 
 # ================= SCREENING TABLES =================
 
@@ -139,7 +179,7 @@ class SpeechLanguage(Base):
     assessment_id: Mapped[int] = mapped_column(ForeignKey("assessments.id"), unique=True)
 
     names_objects: Mapped[bool] = mapped_column(default=False)
-    audio_path: Mapped[str | None]
+    audio_path: Mapped[str | None] = mapped_column(index=True)
 
     assessment: Mapped["Assessment"] = relationship(back_populates="speech")
 
@@ -193,3 +233,86 @@ class Recommendation(Base):
     follow_up_months: Mapped[int | None]
 
     assessment: Mapped["Assessment"] = relationship(back_populates="recommendations")
+
+
+# ================= CHILD MERGES =================
+
+class ChildMerge(Base):
+    __tablename__ = "child_merges"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # Plain ids rather than FKs: audit rows must outlive either child being deleted or merged again.
+    winner_child_id: Mapped[int] = mapped_column(index=True)
+    loser_child_id: Mapped[int] = mapped_column(index=True)
+    loser_name: Mapped[str] = mapped_column(String(200))
+    loser_guardian_phone: Mapped[str | None]
+    assessments_moved: Mapped[int] = mapped_column(default=0)
+    merged_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+
+
+# ================= AUDIT =================
+
+class AuditEvent(Base):
+    __tablename__ = "audit_events"
+
+    # Append-only: rows are inserted in batches by app.audit.AuditJournal and never updated.
+    id: Mapped[int] = mapped_column(primary_key=True)
+    assessment_id: Mapped[int] = mapped_column(Integer)
+    entity: Mapped[str] = mapped_column(String(50))
+    field: Mapped[str] = mapped_column(String(100))
+    old_value: Mapped[str | None] = mapped_column(Text)
+    new_value: Mapped[str | None] = mapped_column(Text)
+    actor: Mapped[str | None] = mapped_column(String(100))
+    changed_at: Mapped[datetime] = mapped_column(DateTime)
+
+    __table_args__ = (Index("ix_audit_events_assessment_id_id", "assessment_id", "id"),)
+
+
+# ================= TRIAGE =================
+
+class TriageItem(Base):
+    __tablename__ = "triage_queue"
+
+    # One row per at-risk assessment, written by app.triage at completion.
+    id: Mapped[int] = mapped_column(primary_key=True)
+    assessment_id: Mapped[int] = mapped_column(ForeignKey("assessments.id"), unique=True)
+    child_id: Mapped[int] = mapped_column(ForeignKey("children.id"), index=True)
+    center_id: Mapped[int | None] = mapped_column(ForeignKey("centers.id"))
+
+    severity: Mapped[float] = mapped_column(Float)
+    domains_at_risk: Mapped[int] = mapped_column(Integer)
+    status: Mapped[TriageStatus] = mapped_column(Enum(TriageStatus), default=TriageStatus.open)
+    claimed_by: Mapped[str | None] = mapped_column(String(100))
+    claimed_at: Mapped[datetime | None] = mapped_column(DateTime)
+
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Queue order is (severity DESC, id): the next item is the first entry of the index range.
+    __table_args__ = (
+        Index("ix_triage_status_severity", "status", text("severity DESC"), "id"),
+        Index("ix_triage_center_status_severity", "center_id", "status", text("severity DESC"), "id"),
+        Index("ix_triage_status_claimed_at", "status", "claimed_at"),
+    )
+
+
+# ================= SYNC =================
+
+class SyncChange(Base):
+    __tablename__ = "sync_changes"
+
+    # AUTOINCREMENT keeps ids strictly increasing, so the id doubles as the sync cursor.
+    # Rows are written by triggers (see app/sync.py), not by the ORM.
+    id: Mapped[int] = mapped_column(primary_key=True)
+    entity: Mapped[str] = mapped_column(String(20))
+    entity_id: Mapped[int]
+    op: Mapped[str] = mapped_column(String(10))
+    # Center of the changed row, so a device pages through its own center only.
+    center_id: Mapped[int | None]
+
+    __table_args__ = (
+        Index("ix_sync_changes_entity_id", "entity", "id"),
+        Index("ix_sync_changes_center_id", "center_id", "id"),
+        Index("ix_sync_changes_center_entity_id", "center_id", "entity", "id"),
+        {"sqlite_autoincrement": True},
+    )
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import html
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from string import Template
+
+from .db import BASE_DIR
+from .models import Assessment, Child
+
+REPORT_CACHE_DIR = BASE_DIR / "report_cache"
+REPORT_WORKERS = int(os.environ.get("REPORT_WORKERS", "2"))
+# Optional Unicode TTF (e.g. Noto Sans) for names outside Latin-1; core fonts are used otherwise.
+REPORT_FONT_PATH = os.environ.get("REPORT_FONT_PATH")
+
+_REPORT_TEMPLATE = Template(
+    """
+<h1>Early Screening Report</h1>
+<p><b>Child:</b> $child_name &nbsp; <b>Age:</b> $age_months months<br>
+<b>Guardian:</b> $guardian_name &nbsp; <b>Phone:</b> $guardian_phone<br>
+<b>Assessment:</b> #$assessment_id &nbsp; <b>Completed:</b> $completed_at</p>
+<h2>Domain scores</h2>
+<table width="100%" border="1">
+<thead><tr><th width="60%">Domain</th><th width="40%">Score</th></tr></thead>
+<tbody>
+$score_rows
+</tbody>
+</table>
+<p><b>Composite score:</b> $composite_score<br>
+<b>Classification:</b> $classification</p>
+<h2>Recommendations</h2>
+<ul>
+$recommendation_items
+</ul>
+<p><font size="8">Scoring rules: $ruleset_version</font></p>
+"""
+)
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def report_context(a: Assessment, child: Child) -> dict:
+    """Plain, picklable snapshot of everything a report shows."""
+    return {
+        "assessment_id": a.id,
+        "ruleset_version": a.ruleset_version or "legacy",
+        "version_stamp": f"{a.updated_at.isoformat()}|{child.updated_at.isoformat()}",
+        "child_name": child.name,
+        "age_months": child.age_months,
+        "guardian_name": child.guardian_name or "-",
+        "guardian_phone": child.guardian_phone or "-",
+        "completed_at": a.completed_at.strftime("%d %b %Y") if a.completed_at else "not completed",
+        "domain_scores": [
+            ("Vision", a.vision_score),
+            ("Hearing", a.hearing_score),
+            ("Speech & language", a.speech_score),
+            ("Motor", a.motor_score),
+            ("Cognitive", a.cognitive_score),
+        ],
+        "composite_score": a.composite_score,
+        "classification": a.classification.value if a.classification else "-",
+        "recommendations": [(r.domain, r.description) for r in a.recommendations],
+    }
+
+
+def render_report_html(ctx: dict) -> str:
+    e = html.escape
+    score_rows = "\n".join(
+        f"<tr><td>{e(name)}</td><td>{'-' if score is None else score}</td></tr>" for name, score in ctx["domain_scores"]
+    )
+    recommendation_items = "\n".join(
+        f"<li><b>{e(domain.title())}:</b> {e(description)}</li>" for domain, description in ctx["recommendations"]
+    )
+    return _REPORT_TEMPLATE.substitute(
+        child_name=e(ctx["child_name"]),
+        age_months=ctx["age_months"],
+        guardian_name=e(ctx["guardian_name"]),
+        guardian_phone=e(ctx["guardian_phone"]),
+        assessment_id=ctx["assessment_id"],
+        completed_at=e(ctx["completed_at"]),
+        score_rows=score_rows,
+        composite_score="-" if ctx["composite_score"] is None else ctx["composite_score"],
+        classification=e(ctx["classification"]),
+        recommendation_items=recommendation_items or "<li>None</li>",
+        ruleset_version=e(ctx["ruleset_version"]),
+    )
+
+
+def render_report_pdf(ctx: dict) -> bytes:
+    # Imported here so only the worker processes pay for loading fpdf.
+    from fpdf import FPDF
+
+    pdf = FPDF(format="A4")
+    pdf.set_title(f"Screening report #{ctx['assessment_id']}")
+    if REPORT_FONT_PATH:
+        pdf.add_font("report", fname=REPORT_FONT_PATH)
+        pdf.set_font("report", size=11)
+        body = render_report_html(ctx)
+    else:
+        pdf.set_font("helvetica", size=11)
+        body = render_report_html(ctx).encode("latin-1", "replace").decode("latin-1")
+    pdf.add_page()
+    pdf.write_html(body)
+    return bytes(pdf.output())
+
+
+def _cache_dir(assessment_id: int) -> Path:
+    # Sharded so replacing one assessment's report only lists a small directory.
+    return REPORT_CACHE_DIR / f"{assessment_id % 1000:03d}"
+
+
+def cache_path(ctx: dict) -> Path:
+    stamp = hashlib.blake2b(ctx["version_stamp"].encode(), digest_size=6).hexdigest()
+    return _cache_dir(ctx["assessment_id"]) / f"report_{ctx['assessment_id']}_{ctx['ruleset_version']}_{stamp}.pdf"
+
+
+def _remove_stale(path: Path, assessment_id: int) -> None:
+    """Drop PDFs rendered for earlier versions of the assessment."""
+    for old in path.parent.glob(f"report_{assessment_id}_*.pdf"):
+        if old != path:
+            old.unlink(missing_ok=True)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=REPORT_WORKERS)
+    return _pool
+
+
+async def get_report_pdf(ctx: dict) -> Path:
+    """Path of the cached PDF for `ctx`, rendering it in the process pool on a miss."""
+    path = cache_path(ctx)
+    if path.exists():
+        return path
+
+    pdf = await asyncio.wrap_future(_get_pool().submit(render_report_pdf, ctx))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.{id(ctx)}.tmp")
+    tmp.write_bytes(pdf)
+    os.replace(tmp, path)
+    _remove_stale(path, ctx["assessment_id"])
+    return path
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
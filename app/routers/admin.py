@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import logging
+import threading
+
+from fastapi import APIRouter, HTTPException
+
+from ..admission import stats
+from ..audit import journal
+from ..backup import BackupError, create_backup, list_backups
+from ..events import completions
+from ..rules import RuleSetError, registry
+from ..schemas import RuleSetActivateIn
+
+router = APIRouter(tags=["admin"])
+
+logger = logging.getLogger(__name__)
+
+
+@router.get("/admin/admission-stats")
+def admission_stats():
+    return {
+        "admitted_writes": stats.admitted,
+        "shed_rate_limited": stats.shed_rate_limited,
+        "shed_concurrency": stats.shed_concurrency,
+        "evicted_buckets": stats.evicted_buckets,
+    }
+
+
+@router.get("/admin/event-stats")
+def event_stats():
+    return completions.stats()
+
+
+@router.get("/admin/audit-stats")
+def audit_stats():
+    return journal.stats()
+
+
+@router.get("/admin/rulesets")
+def list_rulesets():
+    return registry.describe()
+
+
+@router.post("/admin/rulesets/reload")
+def reload_rulesets():
+    # Files are validated and compiled before anything is swapped in.
+    try:
+        registry.reload()
+    except (RuleSetError, ValueError, KeyError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return registry.describe()
+
+
+@router.post("/admin/rulesets/activate")
+def activate_ruleset(payload: RuleSetActivateIn):
+    try:
+        registry.activate(payload.version, payload.candidate_version, payload.candidate_percent)
+    except RuleSetError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return registry.describe()
+
+
+def _run_backup() -> None:
+    try:
+        create_backup()
+    except BackupError:
+        logger.warning("Backup skipped: another backup is running")
+    except Exception:
+        logger.exception("Backup failed")
+
+
+@router.post("/admin/backups", status_code=202)
+def start_backup():
+    # Runs off the request path; poll GET /admin/backups for the finished manifest.
+    threading.Thread(target=_run_backup, name="backup", daemon=True).start()
+    return {"status": "started"}
+
+
+@router.get("/admin/backups")
+def get_backups():
+    return list_backups()
@@ -1,14 +1,25 @@
 from __future__ import annotations
 
+import asyncio
 import os
+import tempfile
+import zipfile
 from datetime import datetime
-from pathlib import Path
+from types import SimpleNamespace
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Request, Response, UploadFile
+from fastapi.responses import FileResponse, HTMLResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 
-from ..db import get_db
+from ..audit import diff_changes, get_actor, journal
+from ..caching import conditional_response, make_etag
+from ..db import get_db, read_db, switch_to_primary
+from ..events import completions
 from ..init_db import init_db
+from ..merge import resolve_child
 from ..models import (
     Assessment,
     AssessmentStatus,
@@ -25,30 +36,24 @@ from ..schemas import (
     AssessmentCreate,
     AssessmentOut,
     AssessmentReportOut,
+    AuditEventOut,
     CaregiverIn,
     CognitiveIn,
     HearingIn,
     MotorIn,
     RecommendationOut,
+    ReportBatchIn,
     SpeechIn,
     VisionIn,
 )
-from ..scoring import (
-    classify,
-    composite_score,
-    recommendations_for,
-    score_cognitive,
-    score_hearing,
-    score_motor,
-    score_speech,
-    score_vision,
-)
+from ..reports import get_report_pdf, render_report_html, report_context
+from ..rules import registry
+from ..storage import AUDIO_EXTENSIONS, store, transcoder
+from ..streaming import AUDIO_CONTENT_TYPES, RangeFileResponse
+from ..triage import update_for_assessment
 
 router = APIRouter(tags=["assessments"])
 
-UPLOAD_DIR = Path(__file__).resolve().parents[2] / "uploads"
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
 # Initialize DB tables on first import (MVP).
 init_db()
 
@@ -66,6 +71,7 @@ def _assessment_out(a: Assessment) -> AssessmentOut:
         composite_score=a.composite_score,
         classification=a.classification.value if a.classification else None,
         followup_months=a.followup_months,
+        ruleset_version=a.ruleset_version,
         created_at=a.created_at,
         completed_at=a.completed_at,
     )
@@ -73,13 +79,13 @@ def _assessment_out(a: Assessment) -> AssessmentOut:
 
 @router.post("/assessments", response_model=AssessmentOut)
 def create_assessment(payload: AssessmentCreate, db: Session = Depends(get_db)):
-    child = db.get(Child, payload.child_id)
+    child = resolve_child(db, payload.child_id)
     if not child:
         raise HTTPException(status_code=404, detail="Child not found")
     if not child.consent_obtained:
         raise HTTPException(status_code=400, detail="Consent is required before assessment")
 
-    a = Assessment(child_id=payload.child_id, status=AssessmentStatus.in_progress)
+    a = Assessment(child_id=child.id, center_id=child.center_id, status=AssessmentStatus.in_progress)
     db.add(a)
     db.commit()
     db.refresh(a)
@@ -87,60 +93,89 @@ def create_assessment(payload: AssessmentCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/assessments/{assessment_id}", response_model=AssessmentOut)
-def get_assessment(assessment_id: int, db: Session = Depends(get_db)):
+def get_assessment(assessment_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     a = db.get(Assessment, assessment_id)
     if not a:
         raise HTTPException(status_code=404, detail="Assessment not found")
+
+    not_modified = conditional_response(request, response, make_etag("assessment", a.id, a.updated_at), a.updated_at)
+    if not_modified is not None:
+        return not_modified
+
     return _assessment_out(a)
 
 
 @router.post("/assessments/{assessment_id}/vision", response_model=AssessmentOut)
-def submit_vision(assessment_id: int, payload: VisionIn, db: Session = Depends(get_db)):
+def submit_vision(
+    assessment_id: int,
+    payload: VisionIn,
+    db: Session = Depends(get_db),
+    actor: str | None = Depends(get_actor),
+):
     a = db.get(Assessment, assessment_id)
     if not a:
         raise HTTPException(status_code=404, detail="Assessment not found")
 
     v = a.vision or VisionScreening(assessment_id=a.id)
-    for k, val in payload.model_dump().items():
+    values = payload.model_dump()
+    changes = diff_changes(v, values)
+    for k, val in values.items():
         setattr(v, k, val)
 
     a.vision = v
     db.add(a)
     db.commit()
+    journal.record(a.id, "vision", changes, actor)
     db.refresh(a)
     return _assessment_out(a)
 
 
 @router.post("/assessments/{assessment_id}/hearing", response_model=AssessmentOut)
-def submit_hearing(assessment_id: int, payload: HearingIn, db: Session = Depends(get_db)):
+def submit_hearing(
+    assessment_id: int,
+    payload: HearingIn,
+    db: Session = Depends(get_db),
+    actor: str | None = Depends(get_actor),
+):
     a = db.get(Assessment, assessment_id)
     if not a:
         raise HTTPException(status_code=404, detail="Assessment not found")
 
     h = a.hearing or HearingScreening(assessment_id=a.id)
-    for k, val in payload.model_dump().items():
+    values = payload.model_dump()
+    changes = diff_changes(h, values)
+    for k, val in values.items():
         setattr(h, k, val)
 
     a.hearing = h
     db.add(a)
     db.commit()
+    journal.record(a.id, "hearing", changes, actor)
     db.refresh(a)
     return _assessment_out(a)
 
 
 @router.post("/assessments/{assessment_id}/speech", response_model=AssessmentOut)
-def submit_speech(assessment_id: int, payload: SpeechIn, db: Session = Depends(get_db)):
+def submit_speech(
+    assessment_id: int,
+    payload: SpeechIn,
+    db: Session = Depends(get_db),
+    actor: str | None = Depends(get_actor),
+):
     a = db.get(Assessment, assessment_id)
     if not a:
         raise HTTPException(status_code=404, detail="Assessment not found")
 
     s = a.speech or SpeechLanguage(assessment_id=a.id)
-    for k, val in payload.model_dump().items():
+    values = payload.model_dump()
+    changes = diff_changes(s, values)
+    for k, val in values.items():
         setattr(s, k, val)
 
     a.speech = s
     db.add(a)
     db.commit()
+    journal.record(a.id, "speech", changes, actor)
     db.refresh(a)
     return _assessment_out(a)
 
@@ -150,81 +185,133 @@ def upload_speech_audio(
     assessment_id: int,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
+    actor: str | None = Depends(get_actor),
 ):
     a = db.get(Assessment, assessment_id)
     if not a:
         raise HTTPException(status_code=404, detail="Assessment not found")
 
     ext = os.path.splitext(file.filename or "audio")[1].lower() or ".wav"
-    safe_ext = ext if ext in {".wav", ".m4a", ".aac", ".mp3", ".ogg"} else ".wav"
+    safe_ext = ext if ext in AUDIO_EXTENSIONS else ".wav"
 
-    out_path = UPLOAD_DIR / f"speech_{assessment_id}_{int(datetime.utcnow().timestamp())}{safe_ext}"
-    with out_path.open("wb") as f:
-        f.write(file.file.read())
+    # The previous recording is left in place; the storage sweep removes it after the retention window.
+    key = store.save(assessment_id, file.file, safe_ext)
 
     s = a.speech or SpeechLanguage(assessment_id=a.id)
-    s.audio_path = str(out_path)
+    previous = s.audio_path
+    changes = diff_changes(s, {"audio_path": key})
+    s.audio_path = key
     a.speech = s
 
     db.add(a)
     db.commit()
+    if previous:
+        store.mark_superseded(previous)
+    journal.record(a.id, "speech", changes, actor)
+    transcoder.submit(a.id, key)
     db.refresh(a)
     return _assessment_out(a)
 
 
+@router.get("/assessments/{assessment_id}/speech/audio", response_class=RangeFileResponse)
+def get_speech_audio(assessment_id: int, request: Request, db: Session = Depends(get_db)):
+    a = db.get(Assessment, assessment_id)
+    if not a:
+        raise HTTPException(status_code=404, detail="Assessment not found")
+    if not (a.speech and a.speech.audio_path):
+        raise HTTPException(status_code=404, detail="No recording for this assessment")
+
+    path = store.resolve(a.speech.audio_path)
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Recording file is missing")
+
+    media_type = AUDIO_CONTENT_TYPES.get(path.suffix.lower(), "application/octet-stream")
+    return RangeFileResponse(path, request.headers, media_type, stat)
+
+
 @router.post("/assessments/{assessment_id}/motor", response_model=AssessmentOut)
-def submit_motor(assessment_id: int, payload: MotorIn, db: Session = Depends(get_db)):
+def submit_motor(
+    assessment_id: int,
+    payload: MotorIn,
+    db: Session = Depends(get_db),
+    actor: str | None = Depends(get_actor),
+):
     a = db.get(Assessment, assessment_id)
     if not a:
         raise HTTPException(status_code=404, detail="Assessment not found")
 
     m = a.motor or MotorSkills(assessment_id=a.id)
-    for k, val in payload.model_dump().items():
+    values = payload.model_dump()
+    changes = diff_changes(m, values)
+    for k, val in values.items():
         setattr(m, k, val)
 
     a.motor = m
     db.add(a)
     db.commit()
+    journal.record(a.id, "motor", changes, actor)
     db.refresh(a)
     return _assessment_out(a)
 
 
 @router.post("/assessments/{assessment_id}/cognitive", response_model=AssessmentOut)
-def submit_cognitive(assessment_id: int, payload: CognitiveIn, db: Session = Depends(get_db)):
+def submit_cognitive(
+    assessment_id: int,
+    payload: CognitiveIn,
+    db: Session = Depends(get_db),
+    actor: str | None = Depends(get_actor),
+):
     a = db.get(Assessment, assessment_id)
     if not a:
         raise HTTPException(status_code=404, detail="Assessment not found")
 
     c = a.cognitive or CognitiveSkills(assessment_id=a.id)
-    for k, val in payload.model_dump().items():
+    values = payload.model_dump()
+    changes = diff_changes(c, values)
+    for k, val in values.items():
         setattr(c, k, val)
 
     a.cognitive = c
     db.add(a)
     db.commit()
+    journal.record(a.id, "cognitive", changes, actor)
     db.refresh(a)
     return _assessment_out(a)
 
 
 @router.post("/assessments/{assessment_id}/caregiver", response_model=AssessmentOut)
-def submit_caregiver(assessment_id: int, payload: CaregiverIn, db: Session = Depends(get_db)):
+def submit_caregiver(
+    assessment_id: int,
+    payload: CaregiverIn,
+    db: Session = Depends(get_db),
+    actor: str | None = Depends(get_actor),
+):
     a = db.get(Assessment, assessment_id)
     if not a:
         raise HTTPException(status_code=404, detail="Assessment not found")
 
     cg = a.caregiver or CaregiverQuestionnaire(assessment_id=a.id)
-    for k, val in payload.model_dump().items():
+    values = payload.model_dump()
+    changes = diff_changes(cg, values)
+    for k, val in values.items():
         setattr(cg, k, val)
 
     a.caregiver = cg
     db.add(a)
     db.commit()
+    journal.record(a.id, "caregiver", changes, actor)
     db.refresh(a)
     return _assessment_out(a)
 
 
 @router.post("/assessments/{assessment_id}/complete", response_model=AssessmentOut)
-def complete_assessment(assessment_id: int, db: Session = Depends(get_db)):
+def complete_assessment(
+    assessment_id: int,
+    db: Session = Depends(get_db),
+    actor: str | None = Depends(get_actor),
+):
     a = db.get(Assessment, assessment_id)
     if not a:
         raise HTTPException(status_code=404, detail="Assessment not found")
@@ -235,120 +322,92 @@ def complete_assessment(assessment_id: int, db: Session = Depends(get_db)):
     if not (a.vision and a.hearing and a.speech and a.motor and a.cognitive):
         raise HTTPException(status_code=400, detail="All 5 domains must be submitted before completion")
 
-    # Domain scoring
-    vision_res = score_vision(
-        identifies_objects=a.vision.identifies_objects,
-        matches_shapes=a.vision.matches_shapes,
-        identifies_sizes=a.vision.identifies_sizes,
-        identifies_colors=a.vision.identifies_colors,
-        squints_or_close=a.vision.squints_or_close,
-        difficulty_shapes_colors=a.vision.difficulty_shapes_colors,
-        avoids_visual_tasks=a.vision.avoids_visual_tasks,
-    )
-    hearing_res = score_hearing(
-        responds_to_soft_name_call=a.hearing.responds_to_soft_name_call,
-        identifies_animal_sounds=a.hearing.identifies_animal_sounds,
-        follows_one_step_command=a.hearing.follows_one_step_command,
-        follows_two_step_command=a.hearing.follows_two_step_command,
-        delayed_response=a.hearing.delayed_response,
-        turns_one_ear=a.hearing.turns_one_ear,
-        asks_repetition=a.hearing.asks_repetition,
-    )
-    speech_res = score_speech(
-        names_objects=a.speech.names_objects,
-        repeats_words=a.speech.repeats_words,
-        answers_simple_questions=a.speech.answers_simple_questions,
-        describes_picture=a.speech.describes_picture,
-        vocabulary_clarity=a.speech.vocabulary_clarity,
-        sentence_length=a.speech.sentence_length,
-        pronunciation=a.speech.pronunciation,
-        confidence=a.speech.confidence,
-    )
-    motor_res = score_motor(
-        fine_drag_drop=a.motor.fine_drag_drop,
-        fine_trace_line=a.motor.fine_trace_line,
-        fine_pick_place=a.motor.fine_pick_place,
-        gross_walk_straight=a.motor.gross_walk_straight,
-        gross_jump_two_feet=a.motor.gross_jump_two_feet,
-        gross_stand_one_foot_5s=a.motor.gross_stand_one_foot_5s,
-        hand_dominance_unclear=a.motor.hand_dominance_unclear,
-        poor_balance=a.motor.poor_balance,
-        weak_grip_coordination=a.motor.weak_grip_coordination,
-    )
-    cognitive_res = score_cognitive(
-        completes_puzzles=a.cognitive.completes_puzzles,
-        matches_patterns=a.cognitive.matches_patterns,
-        counts_objects=a.cognitive.counts_objects,
-        identifies_sequences=a.cognitive.identifies_sequences,
-        memory_game_recall=a.cognitive.memory_game_recall,
-        solves_faster_than_norm=a.cognitive.solves_faster_than_norm,
-        advanced_counting_reasoning=a.cognitive.advanced_counting_reasoning,
-        high_curiosity=a.cognitive.high_curiosity,
-        strong_memory=a.cognitive.strong_memory,
-        creative_responses=a.cognitive.creative_responses,
-    )
+    prior = SimpleNamespace(status=a.status, composite_score=a.composite_score, classification=a.classification)
 
-    a.vision_score = vision_res.score
-    a.hearing_score = hearing_res.score
-    a.speech_score = speech_res.score
-    a.motor_score = motor_res.score
-    a.cognitive_score = cognitive_res.score
-
-    domain_scores = {
-        "vision": a.vision_score,
-        "hearing": a.hearing_score,
-        "speech": a.speech_score,
-        "motor": a.motor_score,
-        "cognitive": a.cognitive_score,
-    }
-
-    a.composite_score = composite_score(
-        vision=a.vision_score,
-        hearing=a.hearing_score,
-        speech=a.speech_score,
-        motor=a.motor_score,
-        cognitive=a.cognitive_score,
-    )
+    # Domain scoring, composite, classification and recommendations from the compiled rule set.
+    ruleset = registry.for_assessment(a.id)
+    # The rule set's age bands (if any) are part of its version.
+    age_months = a.child.age_months
+    outcome = ruleset.evaluate(a, age_months)
 
-    risk_total = vision_res.risk_flags + hearing_res.risk_flags + speech_res.risk_flags + motor_res.risk_flags + cognitive_res.risk_flags
-    high_total = speech_res.high_potential_flags + motor_res.high_potential_flags + cognitive_res.high_potential_flags
-
-    a.classification = classify(domain_scores=domain_scores, risk_flags_total=risk_total, high_flags_total=high_total)
+    (a.vision_score, a.hearing_score, a.speech_score, a.motor_score, a.cognitive_score) = outcome.domain_scores
+    a.composite_score = outcome.composite_score
+    a.classification = outcome.classification
+    a.ruleset_version = ruleset.version
 
     # Recommendations
     a.recommendations.clear()
-    recs = recommendations_for(classification=a.classification, domain_scores=domain_scores)
+    recs = outcome.recommendations
     for r in recs:
         a.recommendations.append(
             Recommendation(
-                recommendation_type=r["recommendation_type"],
-                domain=r["domain"],
-                description=r["description"],
-                follow_up_months=r.get("follow_up_months"),
+                recommendation_type=r.recommendation_type,
+                domain=r.domain,
+                description=r.description,
+                follow_up_months=r.follow_up_months,
             )
         )
 
-    a.followup_months = max((r.get("follow_up_months") or 0) for r in recs) if recs else None
+    a.followup_months = max((r.follow_up_months or 0) for r in recs) if recs else None
 
+    changes = diff_changes(
+        prior,
+        {
+            "status": AssessmentStatus.completed,
+            "composite_score": a.composite_score,
+            "classification": a.classification,
+        },
+    )
     a.status = AssessmentStatus.completed
     a.completed_at = datetime.utcnow()
+    update_for_assessment(db, a, ruleset.risk_thresholds(age_months))
 
     db.add(a)
     db.commit()
+    journal.record(a.id, "assessment", changes, actor)
     db.refresh(a)
+    completions.publish(
+        {
+            "assessment_id": a.id,
+            "child_id": a.child_id,
+            "center_id": a.center_id,
+            "classification": a.classification.value if a.classification else None,
+            "composite_score": a.composite_score,
+            "completed_at": a.completed_at.isoformat(),
+        }
+    )
 
     return _assessment_out(a)
 
 
-@router.get("/assessments/{assessment_id}/report", response_model=AssessmentReportOut)
-def get_report(assessment_id: int, db: Session = Depends(get_db)):
+def _load_report_rows(db: Session, assessment_id: int) -> tuple[Assessment, Child]:
     a = db.get(Assessment, assessment_id)
+    # Completed since the last snapshot refresh (or not in it at all): read app.db.
+    if (a is None or a.status != AssessmentStatus.completed) and switch_to_primary(db):
+        a = db.get(Assessment, assessment_id)
     if not a:
         raise HTTPException(status_code=404, detail="Assessment not found")
-
     child = db.get(Child, a.child_id)
     if not child:
         raise HTTPException(status_code=404, detail="Child not found")
+    return a, child
+
+
+@router.get("/assessments/{assessment_id}/report", response_model=AssessmentReportOut)
+def get_report(
+    assessment_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(read_db("get_report")),
+):
+    a, child = _load_report_rows(db, assessment_id)
+
+    # Recommendations are only rewritten on completion, which also bumps the assessment.
+    last_modified = max(a.updated_at, child.updated_at)
+    etag = make_etag("report", a.id, a.updated_at, child.id, child.updated_at)
+    not_modified = conditional_response(request, response, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
 
     assessment_out = _assessment_out(a)
 
@@ -384,3 +443,91 @@ def get_report(assessment_id: int, db: Session = Depends(get_db)):
         classification=a.classification.value if a.classification else None,
         recommendations=recs,
     )
+
+
+@router.get("/assessments/{assessment_id}/history", response_model=list[AuditEventOut])
+def get_assessment_history(assessment_id: int, db: Session = Depends(get_db)):
+    if not db.get(Assessment, assessment_id):
+        raise HTTPException(status_code=404, detail="Assessment not found")
+
+    return [
+        AuditEventOut(
+            entity=e.entity,
+            field=e.field,
+            old_value=e.old_value,
+            new_value=e.new_value,
+            actor=e.actor,
+            changed_at=e.changed_at,
+        )
+        for e in journal.history(db, assessment_id)
+    ]
+
+
+def _load_report_context(db: Session, assessment_id: int) -> dict:
+    return report_context(*_load_report_rows(db, assessment_id))
+
+
+@router.get("/assessments/{assessment_id}/report.html", response_class=HTMLResponse)
+def get_report_html(assessment_id: int, db: Session = Depends(read_db("get_report_html"))):
+    return HTMLResponse(render_report_html(_load_report_context(db, assessment_id)))
+
+
+@router.get("/assessments/{assessment_id}/report.pdf", response_class=FileResponse)
+async def get_report_pdf_file(assessment_id: int, db: Session = Depends(read_db("get_report_pdf"))):
+    ctx = await run_in_threadpool(_load_report_context, db, assessment_id)
+    path = await get_report_pdf(ctx)
+    return FileResponse(path, media_type="application/pdf", filename=f"report_{assessment_id}.pdf")
+
+
+MAX_REPORTS_PER_ZIP = 500
+
+
+def _center_report_ids(db: Session, center_id: int, completed_since: datetime | None) -> list[int]:
+    scoped = db.info.get("center_id")
+    if scoped is not None and scoped != center_id:
+        raise HTTPException(status_code=403, detail="Cannot export another center's reports")
+    # The batch must include reports completed since the last snapshot refresh.
+    switch_to_primary(db)
+    stmt = select(Assessment.id).where(
+        Assessment.center_id == center_id,
+        Assessment.status == AssessmentStatus.completed,
+    )
+    if completed_since is not None:
+        stmt = stmt.where(Assessment.completed_at >= completed_since)
+    ids = list(db.scalars(stmt.order_by(Assessment.completed_at, Assessment.id).limit(MAX_REPORTS_PER_ZIP + 1)))
+    if not ids:
+        raise HTTPException(status_code=404, detail="No completed assessments for this center")
+    if len(ids) > MAX_REPORTS_PER_ZIP:
+        raise HTTPException(
+            status_code=400,
+            detail=f"More than {MAX_REPORTS_PER_ZIP} reports; narrow the batch with completed_since",
+        )
+    return ids
+
+
+@router.post("/assessments/reports.zip", response_class=FileResponse)
+async def get_reports_zip(payload: ReportBatchIn, db: Session = Depends(read_db("get_reports_zip"))):
+    if (payload.assessment_ids is None) == (payload.center_id is None):
+        raise HTTPException(status_code=400, detail="Send either assessment_ids or center_id")
+    if payload.center_id is not None:
+        ids = await run_in_threadpool(_center_report_ids, db, payload.center_id, payload.completed_since)
+    else:
+        ids = list(dict.fromkeys(payload.assessment_ids))
+    contexts = await run_in_threadpool(lambda: [_load_report_context(db, i) for i in ids])
+    paths = await asyncio.gather(*(get_report_pdf(ctx) for ctx in contexts))
+
+    def build_zip() -> str:
+        fd, zip_path = tempfile.mkstemp(suffix=".zip")
+        # PDFs are already compressed; storing avoids burning CPU for nothing.
+        with os.fdopen(fd, "wb") as f, zipfile.ZipFile(f, "w", compression=zipfile.ZIP_STORED) as zf:
+            for ctx, path in zip(contexts, paths):
+                zf.write(path, arcname=f"report_{ctx['assessment_id']}.pdf")
+        return zip_path
+
+    zip_path = await run_in_threadpool(build_zip)
+    return FileResponse(
+        zip_path,
+        media_type="application/zip",
+        filename="reports.zip",
+        background=BackgroundTask(os.unlink, zip_path),
+    )
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..db import get_db
+from ..models import Center
+from ..schemas import CenterCreate, CenterOut
+
+router = APIRouter(tags=["centers"])
+
+
+def _center_out(c: Center) -> CenterOut:
+    return CenterOut(id=c.id, name=c.name, district=c.district, created_at=c.created_at)
+
+
+@router.post("/centers", response_model=CenterOut)
+def create_center(payload: CenterCreate, db: Session = Depends(get_db)):
+    center = Center(name=payload.name, district=payload.district)
+    db.add(center)
+    db.commit()
+    db.refresh(center)
+    return _center_out(center)
+
+
+@router.get("/centers", response_model=list[CenterOut])
+def list_centers(district: str | None = None, db: Session = Depends(get_db)):
+    stmt = select(Center).order_by(Center.id)
+    if district is not None:
+        stmt = stmt.where(Center.district == district)
+    return [_center_out(c) for c in db.scalars(stmt)]
+
+
+@router.get("/centers/{center_id}", response_model=CenterOut)
+def get_center(center_id: int, db: Session = Depends(get_db)):
+    c = db.get(Center, center_id)
+    if not c:
+        raise HTTPException(status_code=404, detail="Center not found")
+    return _center_out(c)
@@ -1,67 +1,168 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from ..db import get_db
-from ..models import Child
-from ..schemas import ChildCreate, ChildOut
+from ..caching import conditional_response, make_etag
+from ..db import get_db, read_db
+from ..dedupe import apply_blocking_keys, find_duplicate_candidates, is_strong_match
+from ..merge import MergeError, merge_children, resolve_child
+from ..models import Child, SyncChange
+from ..schemas import ChildCreate, ChildCreateOut, ChildMergeIn, ChildMergeOut, ChildOut
+from ..search import MAX_RESULTS, MIN_QUERY_LENGTH, search_child_ids
 
 router = APIRouter(tags=["children"])
 
 
-@router.post("/children", response_model=ChildOut)
-def create_child(payload: ChildCreate, db: Session = Depends(get_db)):
+def _child_fields(c: Child) -> dict:
+    return {
+        "id": c.id,
+        "center_id": c.center_id,
+        "name": c.name,
+        "age_months": c.age_months,
+        "guardian_name": c.guardian_name,
+        "guardian_phone": c.guardian_phone,
+        "consent_obtained": c.consent_obtained,
+        "created_at": c.created_at,
+    }
+
+
+def _child_out(c: Child) -> ChildOut:
+    return ChildOut(**_child_fields(c))
+
+
+@router.post("/children", response_model=ChildCreateOut)
+def create_child(
+    payload: ChildCreate,
+    on_duplicate: Literal["create", "reject", "merge"] = "create",
+    merge_into: int | None = None,
+    db: Session = Depends(get_db),
+):
+    scoped_center = db.info.get("center_id")
+    if scoped_center is not None and payload.center_id not in (None, scoped_center):
+        raise HTTPException(status_code=403, detail="Cannot register a child in another center")
+
+    candidates = find_duplicate_candidates(
+        db,
+        name=payload.name,
+        age_months=payload.age_months,
+        guardian_phone=payload.guardian_phone,
+    )
+    duplicates = [_child_out(c) for c in candidates]
+
+    if candidates and on_duplicate == "reject":
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Possible duplicate child", "candidate_ids": [c.id for c in candidates]},
+        )
+
+    if on_duplicate == "merge" and (candidates or merge_into is not None):
+        if merge_into is not None:
+            existing = resolve_child(db, merge_into)
+            if existing is None:
+                raise HTTPException(status_code=404, detail="Child to merge into not found")
+        else:
+            strong = [
+                c
+                for c in candidates
+                if is_strong_match(
+                    c,
+                    name=payload.name,
+                    guardian_name=payload.guardian_name,
+                    guardian_phone=payload.guardian_phone,
+                )
+            ]
+            if len(strong) != 1:
+                # Only a phonetic/phone/age resemblance (or several exact ones): let the worker pick.
+                raise HTTPException(
+                    status_code=409,
+                    detail={
+                        "message": "No unambiguous match; repeat with merge_into=<child id> or on_duplicate=create",
+                        "candidates": [jsonable_encoder(d) for d in duplicates],
+                    },
+                )
+            existing = strong[0]
+        # Only fill in details the existing registration is missing.
+        existing.guardian_name = existing.guardian_name or payload.guardian_name
+        existing.guardian_phone = existing.guardian_phone or payload.guardian_phone
+        existing.consent_obtained = existing.consent_obtained or payload.consent_obtained
+        apply_blocking_keys(existing)
+        db.commit()
+        db.refresh(existing)
+        return ChildCreateOut(
+            **_child_fields(existing),
+            possible_duplicates=[d for d in duplicates if d.id != existing.id],
+            merged=True,
+        )
+
     child = Child(
+        center_id=payload.center_id,
         name=payload.name,
         age_months=payload.age_months,
         guardian_name=payload.guardian_name,
         guardian_phone=payload.guardian_phone,
         consent_obtained=payload.consent_obtained,
     )
+    apply_blocking_keys(child)
     db.add(child)
     db.commit()
     db.refresh(child)
-    return ChildOut(
-        id=child.id,
-        name=child.name,
-        age_months=child.age_months,
-        guardian_name=child.guardian_name,
-        guardian_phone=child.guardian_phone,
-        consent_obtained=child.consent_obtained,
-        created_at=child.created_at,
-    )
+    return ChildCreateOut(**_child_fields(child), possible_duplicates=duplicates)
+
+
+@router.post("/children/merge", response_model=ChildMergeOut)
+def merge_child_records(payload: ChildMergeIn, db: Session = Depends(get_db)):
+    try:
+        merged, moved = merge_children(db, [(p.winner_id, p.loser_id) for p in payload.pairs])
+    except MergeError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    return ChildMergeOut(children_merged=merged, assessments_moved=moved)
 
 
 @router.get("/children", response_model=list[ChildOut])
-def list_children(db: Session = Depends(get_db)):
-    children = db.query(Child).order_by(Child.created_at.desc()).all()
-    return [
-        ChildOut(
-            id=c.id,
-            name=c.name,
-            age_months=c.age_months,
-            guardian_name=c.guardian_name,
-            guardian_phone=c.guardian_phone,
-            consent_obtained=c.consent_obtained,
-            created_at=c.created_at,
-        )
-        for c in children
-    ]
+def list_children(request: Request, response: Response, db: Session = Depends(read_db("list_children"))):
+    # Every insert/update/delete of a child appends to the change log, so its
+    # latest id is an O(log n) version number for the list (per center when scoped).
+    center_id = db.info.get("center_id")
+    stmt = select(func.max(SyncChange.id)).where(SyncChange.entity == "child")
+    if center_id is not None:
+        stmt = stmt.where(SyncChange.center_id == center_id)
+    version = db.scalar(stmt)
+    not_modified = conditional_response(request, response, make_etag("children", center_id, version))
+    if not_modified is not None:
+        return not_modified
+
+    children = db.query(Child).filter(Child.merged_into_id.is_(None)).order_by(Child.created_at.desc()).all()
+    return [_child_out(c) for c in children]
+
+
+@router.get("/children/search", response_model=list[ChildOut])
+def search_children(
+    q: str = Query(min_length=MIN_QUERY_LENGTH, max_length=200),
+    limit: int = Query(default=20, ge=1, le=MAX_RESULTS),
+    db: Session = Depends(read_db("search_children")),
+):
+    ids = search_child_ids(db, q, limit, center_id=db.info.get("center_id"))
+    if not ids:
+        return []
+
+    by_id = {c.id: c for c in db.query(Child).filter(Child.id.in_(ids), Child.merged_into_id.is_(None))}
+    return [_child_out(by_id[i]) for i in ids if i in by_id]
 
 
 @router.get("/children/{child_id}", response_model=ChildOut)
-def get_child(child_id: int, db: Session = Depends(get_db)):
-    c = db.get(Child, child_id)
+def get_child(child_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    c = resolve_child(db, child_id)
     if not c:
         raise HTTPException(status_code=404, detail="Child not found")
 
-    return ChildOut(
-        id=c.id,
-        name=c.name,
-        age_months=c.age_months,
-        guardian_name=c.guardian_name,
-        guardian_phone=c.guardian_phone,
-        consent_obtained=c.consent_obtained,
-        created_at=c.created_at,
-    )
+    not_modified = conditional_response(request, response, make_etag("child", c.id, c.updated_at), c.updated_at)
+    if not_modified is not None:
+        return not_modified
+
+    return _child_out(c)
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from ..events import SSE_HEARTBEAT_SECONDS, Subscriber, TooManySubscribers, completions
+from ..models import Classification
+
+router = APIRouter(tags=["events"])
+
+
+async def _stream(sub: Subscriber):
+    try:
+        # Tell EventSource how long to wait before reconnecting.
+        yield "retry: 5000\n\n"
+        reported = 0
+        while True:
+            try:
+                event_id, event = await asyncio.wait_for(sub.queue.get(), SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if sub.dropped > reported:
+                yield f"event: lagged\ndata: {json.dumps({'dropped': sub.dropped - reported})}\n\n"
+                reported = sub.dropped
+            yield f"id: {event_id}\nevent: assessment.completed\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+    finally:
+        completions.unsubscribe(sub)
+
+
+@router.get("/events/completions")
+async def completion_events(
+    center_id: int | None = None,
+    classification: list[Classification] | None = Query(default=None),
+    x_center_id: int | None = Header(default=None),
+    last_event_id: int | None = Header(default=None),
+):
+    """Server-sent events for completed assessments, optionally for one center / classification."""
+    if x_center_id is not None:
+        if center_id is not None and center_id != x_center_id:
+            raise HTTPException(status_code=403, detail="Cannot subscribe to another center")
+        center_id = x_center_id
+    wanted = frozenset(c.value for c in classification) if classification else None
+    try:
+        sub = completions.subscribe(center_id, wanted, last_event_id)
+    except TooManySubscribers:
+        raise HTTPException(status_code=503, detail="Too many event subscribers", headers={"Retry-After": "30"})
+
+    return StreamingResponse(
+        _stream(sub),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..db import get_db
+from ..models import Assessment, Child, Recommendation, SyncChange
+from ..schemas import SyncChangesOut, SyncRecommendationOut, SyncTombstoneOut
+from ..sync import MAX_PAGE_SIZE
+from .assessments import _assessment_out
+from .children import _child_out
+
+router = APIRouter(tags=["sync"])
+
+_MODELS = {"child": Child, "assessment": Assessment, "recommendation": Recommendation}
+
+
+def _select_visible(model, center_id: int | None):
+    # Recommendations carry no center of their own: scope them through their assessment.
+    if model is Recommendation and center_id is not None:
+        return (
+            select(Recommendation)
+            .join(Assessment, Assessment.id == Recommendation.assessment_id)
+            .where(Assessment.center_id == center_id)
+        )
+    return select(model)
+
+
+@router.get("/sync/changes", response_model=SyncChangesOut)
+def get_changes(
+    since: int = Query(default=0, ge=0),
+    limit: int = Query(default=500, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    center_id = db.info.get("center_id")
+    stmt = select(SyncChange).where(SyncChange.id > since)
+    if center_id is not None:
+        stmt = stmt.where(SyncChange.center_id == center_id)
+    entries = db.scalars(stmt.order_by(SyncChange.id).limit(limit)).all()
+
+    # Only the latest operation per row matters within a page.
+    latest: dict[tuple[str, int], str] = {}
+    for e in entries:
+        latest[(e.entity, e.entity_id)] = e.op
+
+    upserts: dict[str, list[int]] = {entity: [] for entity in _MODELS}
+    deleted = []
+    for (entity, entity_id), op in latest.items():
+        if op == "delete":
+            deleted.append(SyncTombstoneOut(entity=entity, id=entity_id))
+        else:
+            upserts[entity].append(entity_id)
+
+    # Rows deleted after this page are skipped here; their tombstone comes in a later page.
+    rows = {
+        entity: db.scalars(
+            _select_visible(model, center_id).where(model.id.in_(upserts[entity])).order_by(model.id)
+        ).all()
+        if upserts[entity]
+        else []
+        for entity, model in _MODELS.items()
+    }
+
+    # Merged children reach devices as tombstones naming the child they were merged into.
+    deleted += [
+        SyncTombstoneOut(entity="child", id=c.id, merged_into=c.merged_into_id)
+        for c in rows["child"]
+        if c.merged_into_id is not None
+    ]
+
+    return SyncChangesOut(
+        cursor=entries[-1].id if entries else since,
+        has_more=len(entries) == limit,
+        children=[_child_out(c) for c in rows["child"] if c.merged_into_id is None],
+        assessments=[_assessment_out(a) for a in rows["assessment"]],
+        recommendations=[
+            SyncRecommendationOut(
+                id=r.id,
+                assessment_id=r.assessment_id,
+                recommendation_type=r.recommendation_type.value,
+                domain=r.domain,
+                description=r.description,
+                follow_up_months=r.follow_up_months,
+            )
+            for r in rows["recommendation"]
+        ],
+        deleted=deleted,
+    )
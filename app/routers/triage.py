@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session
+
+from ..audit import get_actor
+from ..db import get_db
+from ..models import TriageItem, TriageStatus
+from ..schemas import TriageItemOut, TriagePageOut
+from ..triage import TriageError, claim_next, list_items, release, resolve
+
+router = APIRouter(tags=["triage"])
+
+
+def _item_out(t: TriageItem) -> TriageItemOut:
+    return TriageItemOut(
+        id=t.id,
+        assessment_id=t.assessment_id,
+        child_id=t.child_id,
+        center_id=t.center_id,
+        severity=t.severity,
+        domains_at_risk=t.domains_at_risk,
+        status=t.status.value,
+        claimed_by=t.claimed_by,
+        claimed_at=t.claimed_at,
+        created_at=t.created_at,
+    )
+
+
+def _require_actor(actor: str | None = Depends(get_actor)) -> str:
+    if not actor:
+        raise HTTPException(status_code=400, detail="X-Worker-Id header is required")
+    return actor
+
+
+@router.get("/triage", response_model=TriagePageOut)
+def get_triage_queue(
+    status: TriageStatus = TriageStatus.open,
+    limit: int = Query(default=50, ge=1, le=200),
+    after_severity: float | None = None,
+    after_id: int | None = None,
+    db: Session = Depends(get_db),
+):
+    if (after_severity is None) != (after_id is None):
+        raise HTTPException(status_code=400, detail="after_severity and after_id go together")
+    after = (after_severity, after_id) if after_id is not None else None
+    items = list_items(db, status, limit, after)
+    page = TriagePageOut(items=[_item_out(t) for t in items])
+    if len(items) == limit:
+        page.next_after_severity, page.next_after_id = items[-1].severity, items[-1].id
+    return page
+
+
+@router.post("/triage/claim", response_model=TriageItemOut, responses={204: {"description": "Queue is empty"}})
+def claim_triage_item(db: Session = Depends(get_db), actor: str = Depends(_require_actor)):
+    item = claim_next(db, actor, db.info.get("center_id"))
+    if item is None:
+        return Response(status_code=204)
+    return _item_out(item)
+
+
+def _transition(fn, item_id: int, db: Session, actor: str) -> TriageItemOut:
+    try:
+        return _item_out(fn(db, item_id, actor))
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Triage item not found")
+    except TriageError as e:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.post("/triage/{item_id}/release", response_model=TriageItemOut)
+def release_triage_item(item_id: int, db: Session = Depends(get_db), actor: str = Depends(_require_actor)):
+    return _transition(release, item_id, db, actor)
+
+
+@router.post("/triage/{item_id}/resolve", response_model=TriageItemOut)
+def resolve_triage_item(item_id: int, db: Session = Depends(get_db), actor: str = Depends(_require_actor)):
+    return _transition(resolve, item_id, db, actor)
@@ -0,0 +1,366 @@
+"""Declarative scoring rule sets (app/rulesets/*.json) compiled to flat evaluators.
+
+A rule set is validated and compiled once into tuples of field names and
+precomputed constants; evaluation then walks those tuples with running sums
+and returns preallocated recommendation tuples. Optional "age_bands" override
+weights and thresholds per age band, so the stored rule-set version fully
+describes how an assessment was scored. The default rule set reproduces the
+score_* / composite_score / classify / recommendations_for logic in
+app/scoring.py exactly.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any
+
+from .models import Classification, RecommendationType
+from .schemas import CognitiveIn, HearingIn, MotorIn, SpeechIn, VisionIn
+from .scoring import DOMAINS, MAX_AGE_MONTHS, _clamp_0_100
+
+RULESETS_DIR = Path(__file__).resolve().parent / "rulesets"
+DEFAULT_RULESET = os.environ.get("RULESET_VERSION", "default-v1")
+
+_DOMAIN_SCHEMAS = {
+    "vision": VisionIn,
+    "hearing": HearingIn,
+    "speech": SpeechIn,
+    "motor": MotorIn,
+    "cognitive": CognitiveIn,
+}
+
+
+class RuleSetError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class CompiledDomain:
+    name: str
+    weight: float
+    tasks: tuple[str, ...]
+    task_count: int
+    penalties: tuple[str, ...]
+    penalty_points: float
+    bonuses: tuple[str, ...]
+    bonus_points: float
+    sub_scores: tuple[str, ...]
+    sub_score_weight: float
+    risk_below: int
+    high_from: int | None
+
+
+@dataclass(frozen=True)
+class CompiledRecommendation:
+    recommendation_type: RecommendationType
+    domain: str
+    description: str
+    follow_up_months: int | None
+
+    def for_domain(self, domain: str) -> CompiledRecommendation:
+        return CompiledRecommendation(
+            self.recommendation_type, domain, self.description.format(domain=domain), self.follow_up_months
+        )
+
+    def as_dict(self) -> dict:
+        return {
+            "recommendation_type": self.recommendation_type,
+            "domain": self.domain,
+            "description": self.description,
+            "follow_up_months": self.follow_up_months,
+        }
+
+
+@dataclass(frozen=True)
+class RuleOutcome:
+    # In DOMAINS order.
+    domain_scores: tuple[int, ...]
+    composite_score: float
+    classification: Classification
+    recommendations: tuple[CompiledRecommendation, ...]
+
+    def scores_by_domain(self) -> dict[str, int]:
+        return dict(zip(DOMAINS, self.domain_scores))
+
+
+@dataclass(frozen=True)
+class CompiledRuleSet:
+    version: str
+    # In DOMAINS order.
+    domains: tuple[CompiledDomain, ...]
+    # Domains with each month's age-band overrides applied, indexed by age 0..MAX_AGE_MONTHS.
+    domains_by_month: tuple[tuple[CompiledDomain, ...], ...]
+    high_potential_min_domains: int
+    # At-risk recommendations for every set of at-risk domains, indexed by bitmask.
+    at_risk_by_mask: tuple[tuple[CompiledRecommendation, ...], ...]
+    high_potential: tuple[CompiledRecommendation, ...]
+    low_risk: tuple[CompiledRecommendation, ...]
+
+    def score_domain(self, d: CompiledDomain, obj: Any) -> int:
+        n = 0
+        for f in d.tasks:
+            if getattr(obj, f):
+                n += 1
+        raw = (n / d.task_count) * 100
+
+        if d.sub_scores:
+            sub_total = 0
+            sub_count = 0
+            for f in d.sub_scores:
+                v = getattr(obj, f)
+                if v is not None:
+                    sub_total += v
+                    sub_count += 1
+            if sub_count:
+                raw = raw * (1 - d.sub_score_weight) + (sub_total / sub_count) * d.sub_score_weight
+
+        if d.penalties:
+            n = 0
+            for f in d.penalties:
+                if getattr(obj, f):
+                    n += 1
+            raw = raw - n * d.penalty_points
+        if d.bonuses:
+            n = 0
+            for f in d.bonuses:
+                if getattr(obj, f):
+                    n += 1
+            raw = raw + n * d.bonus_points
+
+        return _clamp_0_100(raw)
+
+    def _domains_for(self, age_months: int | None) -> tuple[CompiledDomain, ...]:
+        if age_months is None:
+            return self.domains
+        return self.domains_by_month[max(0, min(MAX_AGE_MONTHS, age_months))]
+
+    def risk_thresholds(self, age_months: int | None = None) -> dict[str, int]:
+        return {d.name: d.risk_below for d in self._domains_for(age_months)}
+
+    def evaluate(self, assessment: Any, age_months: int | None = None) -> RuleOutcome:
+        """Score an assessment whose five domain relationships are loaded, with the
+        age band of `age_months` applied when the rule set defines bands."""
+        domains = self._domains_for(age_months)
+        scores = tuple(self.score_domain(d, getattr(assessment, d.name)) for d in domains)
+        composite = 0.0
+        risk_mask = 0
+        high = 0
+        bit = 1
+        for d, score in zip(domains, scores):
+            composite += score * d.weight
+            if score < d.risk_below:
+                risk_mask |= bit
+            elif d.high_from is not None and score >= d.high_from:
+                high += 1
+            bit <<= 1
+
+        if risk_mask:
+            classification = Classification.at_risk
+            recs = self.at_risk_by_mask[risk_mask]
+        elif high >= self.high_potential_min_domains:
+            classification = Classification.high_potential
+            recs = self.high_potential
+        else:
+            classification = Classification.low_risk
+            recs = self.low_risk
+
+        return RuleOutcome(
+            domain_scores=scores,
+            composite_score=round(composite, 2),
+            classification=classification,
+            recommendations=recs,
+        )
+
+
+def _require(cond: bool, version: str, message: str) -> None:
+    if not cond:
+        raise RuleSetError(f"Rule set {version!r}: {message}")
+
+
+def _field_names(schema: type) -> set[str]:
+    return set(schema.__fields__)
+
+
+def _compile_recommendation(raw: dict, version: str, domain_default: str = "general") -> CompiledRecommendation:
+    rec_type = raw.get("recommendation_type")
+    _require(rec_type in {t.value for t in RecommendationType}, version, f"unknown recommendation_type {rec_type!r}")
+    _require(isinstance(raw.get("description"), str), version, "recommendation needs a description")
+    return CompiledRecommendation(
+        recommendation_type=RecommendationType(rec_type),
+        domain=raw.get("domain", domain_default),
+        description=raw["description"],
+        follow_up_months=raw.get("follow_up_months"),
+    )
+
+
+def _compile_age_bands(raw_bands: list, domains: tuple[CompiledDomain, ...], version: str):
+    """Expand "age_bands" to one domain tuple per month; months outside every band
+    use the rule set's own values."""
+    by_name = {d.name: d for d in domains}
+    by_month = [domains] * (MAX_AGE_MONTHS + 1)
+    for band in raw_bands:
+        label = band.get("band", "?")
+        lo, hi = band.get("min_months"), band.get("max_months")
+        _require(isinstance(lo, int) and isinstance(hi, int) and 0 <= lo <= hi, version, f"age band {label} range")
+        overrides = {key: band.get(key, {}) for key in ("weights", "risk_below", "high_from")}
+        for key, values in overrides.items():
+            unknown = [name for name in values if name not in by_name]
+            _require(not unknown, version, f"age band {label} {key} has unknown domains {unknown}")
+        banded = []
+        for name in DOMAINS:
+            d = by_name[name]
+            risk_below = overrides["risk_below"].get(name, d.risk_below)
+            high_from = overrides["high_from"].get(name, d.high_from)
+            _require(
+                d.high_from is not None or high_from is None, version, f"age band {label}: {name} has no high_from"
+            )
+            _require(0 <= risk_below <= 100, version, f"age band {label} {name}.risk_below out of range")
+            _require(
+                high_from is None or risk_below <= high_from <= 100,
+                version,
+                f"age band {label} {name}.high_from out of range",
+            )
+            banded.append(
+                replace(d, weight=float(overrides["weights"].get(name, d.weight)), risk_below=risk_below, high_from=high_from)
+            )
+        total_weight = sum(d.weight for d in banded)
+        _require(abs(total_weight - 1.0) < 1e-6, version, f"age band {label} weights sum to {total_weight}")
+        for month in range(lo, min(MAX_AGE_MONTHS, hi) + 1):
+            by_month[month] = tuple(banded)
+    return tuple(by_month)
+
+
+def compile_ruleset(raw: dict) -> CompiledRuleSet:
+    version = raw.get("version")
+    _require(isinstance(version, str) and bool(version), "?", "missing version")
+
+    names = [d.get("name") for d in raw.get("domains", [])]
+    _require(sorted(names) == sorted(DOMAINS), version, f"domains must be exactly {list(DOMAINS)}")
+
+    domains = []
+    for d in raw["domains"]:
+        name = d["name"]
+        allowed = _field_names(_DOMAIN_SCHEMAS[name])
+        groups = {key: tuple(d.get(key, [])) for key in ("tasks", "penalties", "bonuses", "sub_scores")}
+        _require(len(groups["tasks"]) > 0, version, f"{name} needs at least one task")
+        for key, fields in groups.items():
+            unknown = [f for f in fields if f not in allowed]
+            _require(not unknown, version, f"{name}.{key} has unknown fields {unknown}")
+
+        risk_below = d.get("risk_below", 60)
+        high_from = d.get("high_from")
+        _require(0 <= risk_below <= 100, version, f"{name}.risk_below out of range")
+        _require(high_from is None or risk_below <= high_from <= 100, version, f"{name}.high_from out of range")
+        sub_weight = float(d.get("sub_score_weight", 0.5))
+        _require(0.0 <= sub_weight <= 1.0, version, f"{name}.sub_score_weight out of range")
+
+        domains.append(
+            CompiledDomain(
+                name=name,
+                weight=float(d["weight"]),
+                tasks=groups["tasks"],
+                task_count=len(groups["tasks"]),
+                penalties=groups["penalties"],
+                penalty_points=d.get("penalty_points", 10),
+                bonuses=groups["bonuses"],
+                bonus_points=d.get("bonus_points", 3),
+                sub_scores=groups["sub_scores"],
+                sub_score_weight=sub_weight,
+                risk_below=risk_below,
+                high_from=high_from,
+            )
+        )
+
+    total_weight = sum(d.weight for d in domains)
+    _require(abs(total_weight - 1.0) < 1e-6, version, f"domain weights sum to {total_weight}, expected 1.0")
+    domains.sort(key=lambda d: DOMAINS.index(d.name))
+
+    recs = raw.get("recommendations", {})
+    at_risk = recs.get("at_risk", {})
+    _require("per_domain" in at_risk and "fallback" in at_risk, version, "at_risk needs per_domain and fallback")
+    per_domain = _compile_recommendation(at_risk["per_domain"], version)
+    at_risk_by_mask = [(_compile_recommendation(at_risk["fallback"], version),)]
+    for mask in range(1, 1 << len(domains)):
+        at_risk_by_mask.append(
+            tuple(per_domain.for_domain(d.name) for i, d in enumerate(domains) if mask & (1 << i))
+        )
+
+    return CompiledRuleSet(
+        version=version,
+        domains=tuple(domains),
+        domains_by_month=_compile_age_bands(raw.get("age_bands", []), tuple(domains), version),
+        high_potential_min_domains=int(raw.get("high_potential_min_domains", 2)),
+        at_risk_by_mask=tuple(at_risk_by_mask),
+        high_potential=tuple(_compile_recommendation(r, version) for r in recs.get("high_potential", [])),
+        low_risk=tuple(_compile_recommendation(r, version) for r in recs.get("low_risk", [])),
+    )
+
+
+class RuleSetRegistry:
+    """Compiled rule sets plus the active/candidate selection.
+
+    Swaps replace whole immutable objects under a lock, so in-flight
+    evaluations keep the rule set they started with.
+    """
+
+    def __init__(self, directory: Path = RULESETS_DIR, active: str = DEFAULT_RULESET):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._rulesets: dict[str, CompiledRuleSet] = {}
+        self._active = active
+        self._candidate: str | None = None
+        self._candidate_percent = 0
+        self.reload()
+
+    def reload(self) -> list[str]:
+        compiled = {}
+        for path in sorted(self.directory.glob("*.json")):
+            rs = compile_ruleset(json.loads(path.read_text(encoding="utf-8")))
+            if rs.version in compiled:
+                raise RuleSetError(f"Rule set {rs.version!r} is defined more than once")
+            compiled[rs.version] = rs
+        if self._active not in compiled:
+            raise RuleSetError(f"Active rule set {self._active!r} not found in {self.directory}")
+        with self._lock:
+            self._rulesets = compiled
+            if self._candidate not in compiled:
+                self._candidate, self._candidate_percent = None, 0
+        return sorted(compiled)
+
+    def activate(self, version: str, candidate: str | None = None, candidate_percent: int = 0) -> None:
+        with self._lock:
+            for v in (version, candidate):
+                if v is not None and v not in self._rulesets:
+                    raise RuleSetError(f"Unknown rule set {v!r}")
+            self._active = version
+            self._candidate = candidate
+            self._candidate_percent = candidate_percent if candidate else 0
+
+    def get(self, version: str | None = None) -> CompiledRuleSet:
+        """A rule set by version, or the active one."""
+        rulesets = self._rulesets
+        version = version or self._active
+        if version not in rulesets:
+            raise RuleSetError(f"Unknown rule set {version!r}")
+        return rulesets[version]
+
+    def for_assessment(self, assessment_id: int) -> CompiledRuleSet:
+        # Deterministic A/B split, so re-completing an assessment picks the same arm.
+        rulesets = self._rulesets
+        if self._candidate is not None and assessment_id % 100 < self._candidate_percent:
+            return rulesets[self._candidate]
+        return rulesets[self._active]
+
+    def describe(self) -> dict:
+        return {
+            "versions": sorted(self._rulesets),
+            "active": self._active,
+            "candidate": self._candidate,
+            "candidate_percent": self._candidate_percent,
+        }
+
+
+registry = RuleSetRegistry()
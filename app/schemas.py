@@ -6,7 +6,21 @@ from typing import Literal
 from pydantic import BaseModel, Field
 
 
+class CenterCreate(BaseModel):
+    name: str = Field(min_length=1, max_length=200)
+    district: str = Field(min_length=1, max_length=100)
+
+
+class CenterOut(BaseModel):
+    id: int
+    name: str
+    district: str
+    created_at: datetime
+
+
 class ChildCreate(BaseModel):
+    # Defaults to the request's X-Center-Id; must match it when that header is sent.
+    center_id: int | None = None
     name: str = Field(min_length=1, max_length=200)
     age_months: int = Field(ge=0, le=72)
     guardian_name: str | None = None
@@ -16,6 +30,7 @@ class ChildCreate(BaseModel):
 
 class ChildOut(BaseModel):
     id: int
+    center_id: int | None = None
     name: str
     age_months: int
     guardian_name: str | None
@@ -24,6 +39,26 @@ class ChildOut(BaseModel):
     created_at: datetime
 
 
+class ChildCreateOut(ChildOut):
+    # Existing children that share a blocking key with this registration.
+    possible_duplicates: list[ChildOut] = []
+    merged: bool = False
+
+
+class ChildMergePair(BaseModel):
+    winner_id: int
+    loser_id: int
+
+
+class ChildMergeIn(BaseModel):
+    pairs: list[ChildMergePair] = Field(min_items=1, max_items=10000)
+
+
+class ChildMergeOut(BaseModel):
+    children_merged: int
+    assessments_moved: int
+
+
 class AssessmentCreate(BaseModel):
     child_id: int
 
@@ -40,6 +75,7 @@ class AssessmentOut(BaseModel):
     composite_score: float | None
     classification: str | None
     followup_months: int | None
+    ruleset_version: str | None = None
     created_at: datetime
     completed_at: datetime | None
 
@@ -130,6 +166,13 @@ class RecommendationOut(BaseModel):
     follow_up_months: int | None
 
 
+class ReportBatchIn(BaseModel):
+    # Either explicit ids, or every completed assessment of one center.
+    assessment_ids: list[int] | None = Field(default=None, min_items=1, max_items=500)
+    center_id: int | None = None
+    completed_since: datetime | None = None
+
+
 class AssessmentReportOut(BaseModel):
     assessment: AssessmentOut
     child: ChildOut
@@ -137,3 +180,63 @@ class AssessmentReportOut(BaseModel):
     composite_score: float | None
     classification: str | None
     recommendations: list[RecommendationOut]
+
+
+class AuditEventOut(BaseModel):
+    entity: str
+    field: str
+    old_value: str | None
+    new_value: str | None
+    actor: str | None
+    changed_at: datetime
+
+
+class SyncRecommendationOut(BaseModel):
+    id: int
+    assessment_id: int
+    recommendation_type: str
+    domain: str
+    description: str
+    follow_up_months: int | None
+
+
+class SyncTombstoneOut(BaseModel):
+    entity: str
+    id: int
+    # Set for a child merged into another: re-point local records at this id.
+    merged_into: int | None = None
+
+
+class SyncChangesOut(BaseModel):
+    cursor: int
+    has_more: bool
+    children: list[ChildOut]
+    assessments: list[AssessmentOut]
+    recommendations: list[SyncRecommendationOut]
+    deleted: list[SyncTombstoneOut]
+
+
+class RuleSetActivateIn(BaseModel):
+    version: str
+    candidate_version: str | None = None
+    candidate_percent: int = Field(default=0, ge=0, le=100)
+
+
+class TriageItemOut(BaseModel):
+    id: int
+    assessment_id: int
+    child_id: int
+    center_id: int | None
+    severity: float
+    domains_at_risk: int
+    status: str
+    claimed_by: str | None
+    claimed_at: datetime | None
+    created_at: datetime
+
+
+class TriagePageOut(BaseModel):
+    items: list[TriageItemOut]
+    # Pass back as after_severity / after_id for the next page; null on the last page.
+    next_after_severity: float | None = None
+    next_after_id: int | None = None
@@ -1,14 +1,42 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from .models import Classification, RecommendationType
 
+DOMAINS = ("vision", "hearing", "speech", "motor", "cognitive")
+HIGH_POTENTIAL_DOMAINS = ("speech", "motor", "cognitive")
+
+MAX_AGE_MONTHS = 72
+
 
 def _clamp_0_100(x: float) -> int:
     return max(0, min(100, int(round(x))))
 
 
+# Reference form of a rule-set age band (see app/rules.py "age_bands").
+@dataclass(frozen=True)
+class AgeBandNorms:
+    band: str
+    risk_threshold: dict[str, int] = field(default_factory=lambda: {d: 60 for d in DOMAINS})
+    high_threshold: dict[str, int] = field(default_factory=lambda: {d: 85 for d in DOMAINS})
+    weights: dict[str, float] = field(
+        default_factory=lambda: {"vision": 0.15, "hearing": 0.15, "speech": 0.25, "motor": 0.20, "cognitive": 0.25}
+    )
+
+
+DEFAULT_NORMS = AgeBandNorms(band="all")
+
+
+def flag_totals(domain_scores: dict[str, int | None], norms: AgeBandNorms) -> tuple[int, int]:
+    """Risk / high-potential flag counts for already-computed domain scores under `norms`."""
+    risk = sum(1 for d in DOMAINS if domain_scores.get(d) is not None and domain_scores[d] < norms.risk_threshold[d])
+    high = sum(
+        1 for d in HIGH_POTENTIAL_DOMAINS if domain_scores.get(d) is not None and domain_scores[d] >= norms.high_threshold[d]
+    )
+    return risk, high
+
+
 @dataclass
 class DomainScoreResult:
     score: int
@@ -152,7 +180,15 @@ def score_cognitive(
     return DomainScoreResult(score=score, risk_flags=risk_flags, high_potential_flags=high_flags)
 
 
-def composite_score(*, vision: int | None, hearing: int | None, speech: int | None, motor: int | None, cognitive: int | None) -> float | None:
+def composite_score(
+    *,
+    vision: int | None,
+    hearing: int | None,
+    speech: int | None,
+    motor: int | None,
+    cognitive: int | None,
+    norms: AgeBandNorms = DEFAULT_NORMS,
+) -> float | None:
     parts = {"vision": vision, "hearing": hearing, "speech": speech, "motor": motor, "cognitive": cognitive}
     if any(v is None for v in parts.values()):
         return None
@@ -163,19 +199,24 @@ def composite_score(*, vision: int | None, hearing: int | None, speech: int | No
     m = float(motor)
     c = float(cognitive)
 
-    return round(v * 0.15 + h * 0.15 + s * 0.25 + m * 0.20 + c * 0.25, 2)
+    w = norms.weights
+    return round(v * w["vision"] + h * w["hearing"] + s * w["speech"] + m * w["motor"] + c * w["cognitive"], 2)
 
 
-def classify(*, domain_scores: dict[str, int | None], risk_flags_total: int, high_flags_total: int) -> Classification | None:
-    if any(domain_scores.get(k) is None for k in ["vision", "hearing", "speech", "motor", "cognitive"]):
+def classify(
+    *,
+    domain_scores: dict[str, int | None],
+    risk_flags_total: int,
+    high_flags_total: int,
+    norms: AgeBandNorms = DEFAULT_NORMS,
+) -> Classification | None:
+    if any(domain_scores.get(k) is None for k in DOMAINS):
         return None
 
-    scores = [domain_scores["vision"], domain_scores["hearing"], domain_scores["speech"], domain_scores["motor"], domain_scores["cognitive"]]
-
-    if risk_flags_total >= 1 or any((s or 0) < 60 for s in scores):
+    if risk_flags_total >= 1 or any((domain_scores[d] or 0) < norms.risk_threshold[d] for d in DOMAINS):
         return Classification.at_risk
 
-    if high_flags_total >= 2 and sum(1 for s in scores if (s or 0) >= 85) >= 2:
+    if high_flags_total >= 2 and sum(1 for d in DOMAINS if (domain_scores[d] or 0) >= norms.high_threshold[d]) >= 2:
         return Classification.high_potential
 
     return Classification.low_risk
@@ -185,6 +226,7 @@ def recommendations_for(
     *,
     classification: Classification | None,
     domain_scores: dict[str, int | None],
+    norms: AgeBandNorms = DEFAULT_NORMS,
 ) -> list[dict]:
     recs: list[dict] = []
 
@@ -194,7 +236,7 @@ def recommendations_for(
     if classification == Classification.at_risk:
         # Basic interventions per domain below threshold
         for domain, score in domain_scores.items():
-            if score is not None and score < 60:
+            if score is not None and score < norms.risk_threshold.get(domain, 60):
                 recs.append(
                     {
                         "recommendation_type": RecommendationType.intervention,
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import re
+
+from sqlalchemy import Engine, and_, select, text
+from sqlalchemy.orm import Session
+
+from .dedupe import phonetic_key
+from .models import Child
+
+# External-content FTS5 index over children; the trigram tokenizer gives substring
+# matches on names and phone numbers. Query trigrams are AND-ed; typos are caught
+# by the Soundex fallback (_phonetic_ids) instead.
+_FTS_DDL = """
+CREATE VIRTUAL TABLE children_fts USING fts5(
+    name, guardian_name, guardian_phone,
+    content='children', content_rowid='id', tokenize='trigram'
+)
+"""
+
+_FTS_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS children_fts_ai AFTER INSERT ON children BEGIN
+        INSERT INTO children_fts(rowid, name, guardian_name, guardian_phone)
+        VALUES (new.id, new.name, new.guardian_name, new.guardian_phone);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS children_fts_ad AFTER DELETE ON children BEGIN
+        INSERT INTO children_fts(children_fts, rowid, name, guardian_name, guardian_phone)
+        VALUES ('delete', old.id, old.name, old.guardian_name, old.guardian_phone);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS children_fts_merged AFTER UPDATE OF merged_into_id ON children
+    WHEN old.merged_into_id IS NULL AND new.merged_into_id IS NOT NULL BEGIN
+        INSERT INTO children_fts(children_fts, rowid, name, guardian_name, guardian_phone)
+        VALUES ('delete', old.id, old.name, old.guardian_name, old.guardian_phone);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS children_fts_au AFTER UPDATE OF name, guardian_name, guardian_phone ON children BEGIN
+        INSERT INTO children_fts(children_fts, rowid, name, guardian_name, guardian_phone)
+        VALUES ('delete', old.id, old.name, old.guardian_name, old.guardian_phone);
+        INSERT INTO children_fts(rowid, name, guardian_name, guardian_phone)
+        VALUES (new.id, new.name, new.guardian_name, new.guardian_phone);
+    END
+    """,
+]
+
+MIN_QUERY_LENGTH = 3
+MAX_RESULTS = 50
+# At most this many trigram matches are ranked, so a very common name costs the
+# same as a rare one.
+MAX_RANKED = 200
+
+
+def init_search_index(engine: Engine) -> None:
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'children_fts'")
+        ).first()
+        if not exists:
+            conn.execute(text(_FTS_DDL))
+            # Backfill rows that were inserted before the index existed.
+            conn.execute(text("INSERT INTO children_fts(children_fts) VALUES ('rebuild')"))
+        for trigger in _FTS_TRIGGERS:
+            conn.execute(text(trigger))
+
+
+def _tokens(q: str) -> list[str]:
+    return [t for t in re.findall(r"[^\W_]+", q.lower()) if len(t) >= 3]
+
+
+def _covering_trigrams(token: str) -> list[str]:
+    # Non-overlapping trigrams plus the last one: enough to pin the token down
+    # while reading far fewer doclists than every overlapping trigram.
+    starts = list(range(0, len(token) - 2, 3))
+    if starts[-1] != len(token) - 3:
+        starts.append(len(token) - 3)
+    return [token[i : i + 3] for i in starts]
+
+
+def _fts_query(tokens: list[str]) -> str | None:
+    """AND of the covering trigrams of every token; _token_filter then drops the rare
+    rows that contain the trigrams but not the token itself."""
+    trigrams = dict.fromkeys(t for token in tokens for t in _covering_trigrams(token))
+    if not trigrams:
+        return None
+    return " ".join('"' + t.replace('"', '""') + '"' for t in trigrams)
+
+
+def _token_filter(tokens: list[str], table: str, params: dict) -> str:
+    clauses = []
+    for i, token in enumerate(tokens):
+        params[f"t{i}"] = token
+        clauses.append(
+            f"(instr(lower({table}.name), :t{i}) OR instr(lower(coalesce({table}.guardian_name, '')), :t{i}) "
+            f"OR instr(coalesce({table}.guardian_phone, ''), :t{i}))"
+        )
+    return " AND ".join(clauses)
+
+
+def _phonetic_ids(db: Session, q: str, limit: int, center_id: int | None, exclude: set[int]) -> list[int]:
+    """Spelling variants that sound alike (Laxmi/Lakshmi) via the Soundex name keys."""
+    words = [t for t in _tokens(q) if t.isalpha()]
+    if not words:
+        return []
+    key = phonetic_key(" ".join(words))
+    if len(words) > 1:
+        cond = Child.name_key == key
+    else:
+        first = key.split(":")[0]
+        # Index range over every key with this first-name code.
+        cond = and_(Child.name_key >= f"{first}:", Child.name_key < f"{first};")
+    stmt = select(Child.id).where(cond)
+    if center_id is not None:
+        stmt = stmt.where(Child.center_id == center_id)
+    if exclude:
+        stmt = stmt.where(Child.id.not_in(exclude))
+    return list(db.scalars(stmt.order_by(Child.id).limit(limit)))
+
+
+def search_child_ids(db: Session, q: str, limit: int = 20, center_id: int | None = None) -> list[int]:
+    """Child ids best first, optionally within one center: rows containing every query
+    token, then sound-alike names if there are fewer than `limit`."""
+    limit = min(limit, MAX_RESULTS)
+    tokens = list(dict.fromkeys(_tokens(q)))
+    ids: list[int] = []
+    if tokens:
+        params: dict = {"limit": limit}
+        tokens_match = _token_filter(tokens, "children" if center_id is not None else "children_fts", params)
+        # Rows with more query tokens in the name first, then the shortest (closest)
+        # names. bm25() is not used: its per-term statistics walk every trigram's whole
+        # doclist, which cost ~20 ms on common names at 1M children.
+        in_name = " + ".join(f"(instr(lower(name), :t{i}) > 0)" for i in range(len(tokens)))
+        order = f"ORDER BY {in_name} DESC, length(name), id LIMIT :limit"
+        if center_id is None:
+            params["match"] = _fts_query(tokens)
+            params["max_ranked"] = MAX_RANKED
+            sql = (
+                "SELECT id FROM ("
+                "SELECT rowid AS id, name FROM children_fts "
+                f"WHERE children_fts MATCH :match AND {tokens_match} LIMIT :max_ranked"
+                f") {order}"
+            )
+        else:
+            # A center is a few hundred children: scanning them through the center
+            # index is cheaper than intersecting global trigram doclists.
+            params["center_id"] = center_id
+            sql = (
+                "SELECT id FROM children WHERE center_id = :center_id AND merged_into_id IS NULL "
+                f"AND {tokens_match} {order}"
+            )
+        ids = [r[0] for r in db.execute(text(sql), params)]
+
+    if len(ids) < limit:
+        ids += _phonetic_ids(db, q, limit - len(ids), center_id, set(ids))
+    return ids
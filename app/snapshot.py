@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+from .db import DB_PATH, READ_DB_URL, SNAPSHOT_PATH, SNAPSHOT_REFRESH_SECONDS
+
+logger = logging.getLogger(__name__)
+
+def backup_sqlite(src: Path, dst: Path) -> None:
+    """Consistent online copy of `src` into `dst` using SQLite's backup API.
+
+    The copy runs in one step inside a single read transaction. With app.db in
+    WAL mode writers keep committing meanwhile; a page-stepped backup would
+    instead restart on every write from another connection and never finish
+    under steady traffic.
+    """
+    source = sqlite3.connect(src)
+    target = sqlite3.connect(dst)
+    try:
+        source.backup(target, pages=-1)
+        # The copy inherits WAL mode; readers open it read-only, so make it self-contained.
+        target.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        target.close()
+        source.close()
+
+
+def refresh_snapshot() -> None:
+    tmp = SNAPSHOT_PATH.with_suffix(".db.tmp")
+    backup_sqlite(DB_PATH, tmp)
+    # Atomic swap: readers already open keep the old file, new sessions see the new one.
+    os.replace(tmp, SNAPSHOT_PATH)
+
+
+class SnapshotRefresher:
+    def __init__(self, interval: float = SNAPSHOT_REFRESH_SECONDS):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _run(self) -> None:
+        while True:
+            try:
+                refresh_snapshot()
+            except Exception:
+                logger.exception("Failed to refresh read snapshot")
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self) -> None:
+        # Nothing to refresh when reads go to an external replica.
+        if READ_DB_URL or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="snapshot-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+
+refresher = SnapshotRefresher()
@@ -0,0 +1,254 @@
+"""Speech audio storage: sharded layout, background transcoding and retention.
+
+Maintenance (dry run unless --apply):  python -m app.storage sweep [--apply]
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import logging
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+from sqlalchemy import select, update
+
+from .audit import journal
+from .db import BASE_DIR, SessionLocal, engine
+from .models import SpeechLanguage
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_DIR = BASE_DIR / "uploads"
+AUDIO_EXTENSIONS = {".wav", ".m4a", ".aac", ".mp3", ".ogg"}
+# Files no longer referenced by any assessment are kept this long before the sweep removes them.
+# Retention counts from mtime, which AudioStore.mark_superseded resets when a recording is replaced.
+AUDIO_RETENTION_DAYS = int(os.environ.get("AUDIO_RETENTION_DAYS", "30"))
+# WAV uploads are re-encoded to Opus when ffmpeg is available.
+TRANSCODE_WAV = os.environ.get("AUDIO_TRANSCODE", "1") == "1"
+
+_SWEEP_BATCH = 500
+
+
+class AudioStore:
+    """Stores recordings under two levels of hash shards (256 x 256 dirs).
+
+    `SpeechLanguage.audio_path` holds the key relative to the store root;
+    absolute paths written before the store existed still resolve.
+    """
+
+    def __init__(self, root: Path = UPLOAD_DIR):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _shard(self, assessment_id: int) -> str:
+        digest = hashlib.blake2b(str(assessment_id).encode(), digest_size=2).hexdigest()
+        return f"speech/{digest[:2]}/{digest[2:]}"
+
+    def new_key(self, assessment_id: int, ext: str) -> str:
+        return f"{self._shard(assessment_id)}/speech_{assessment_id}_{time.time_ns()}{ext}"
+
+    def resolve(self, key: str) -> Path:
+        path = Path(key)
+        return path if path.is_absolute() else self.root / path
+
+    def save(self, assessment_id: int, src: BinaryIO, ext: str) -> str:
+        key = self.new_key(assessment_id, ext)
+        path = self.resolve(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".part")
+        with tmp.open("wb") as f:
+            shutil.copyfileobj(src, f, length=1024 * 1024)
+        os.replace(tmp, path)
+        return key
+
+    def mark_superseded(self, key: str) -> None:
+        """Restart the retention clock: the sweep measures retention from mtime."""
+        try:
+            os.utime(self.resolve(key))
+        except FileNotFoundError:
+            pass
+
+    def delete(self, key: str) -> None:
+        try:
+            self.resolve(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def iter_files(self) -> Iterator[Path]:
+        """Depth-first walk with os.scandir, yielding files without listing everything up front."""
+        stack = [self.root]
+        while stack:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(Path(entry.path))
+                    elif entry.is_file(follow_symlinks=False):
+                        yield Path(entry.path)
+
+
+store = AudioStore()
+
+
+class Transcoder:
+    """Background WAV -> Opus re-encoding, one file at a time."""
+
+    def __init__(self, audio_store: AudioStore):
+        self.store = audio_store
+        self.ffmpeg = shutil.which("ffmpeg")
+        self._queue: queue.Queue[tuple[int, str] | None] = queue.Queue(maxsize=10_000)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return TRANSCODE_WAV and self.ffmpeg is not None
+
+    def submit(self, assessment_id: int, key: str) -> None:
+        if not self.enabled or not key.endswith(".wav"):
+            return
+        try:
+            self._queue.put_nowait((assessment_id, key))
+        except queue.Full:
+            logger.warning("Transcode queue full; keeping %s as WAV", key)
+
+    def _transcode(self, assessment_id: int, key: str) -> None:
+        src = self.store.resolve(key)
+        if not src.exists():
+            return
+        new_key = self.store.new_key(assessment_id, ".ogg")
+        dst = self.store.resolve(new_key)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        subprocess.run(
+            [self.ffmpeg, "-nostdin", "-loglevel", "error", "-y", "-i", str(src), "-c:a", "libopus", "-b:a", "24k", str(dst)],
+            check=True,
+            timeout=600,
+        )
+        # Only swap if the row still points at the file we transcoded (no newer upload meanwhile).
+        with engine.begin() as conn:
+            result = conn.execute(
+                update(SpeechLanguage)
+                .where(SpeechLanguage.assessment_id == assessment_id, SpeechLanguage.audio_path == key)
+                .values(audio_path=new_key)
+            )
+        if result.rowcount == 1:
+            journal.record(assessment_id, "speech", [("audio_path", key, new_key)], "system:transcoder")
+            self.store.delete(key)
+        else:
+            self.store.delete(new_key)
+
+    def _run(self) -> None:
+        while (item := self._queue.get()) is not None:
+            try:
+                self._transcode(*item)
+            except Exception:
+                logger.exception("Failed to transcode %s", item[1])
+
+    def start(self) -> None:
+        if self.enabled and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="audio-transcoder", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=30)
+            self._thread = None
+
+
+transcoder = Transcoder(store)
+
+
+def _referenced(paths: list[Path]) -> set[str]:
+    keys = {p.relative_to(store.root).as_posix(): p for p in paths}
+    candidates = list(keys) + [str(p) for p in paths]
+    db = SessionLocal()
+    try:
+        rows = db.scalars(select(SpeechLanguage.audio_path).where(SpeechLanguage.audio_path.in_(candidates)))
+        found = set(rows)
+    finally:
+        db.close()
+    return {str(keys[k]) if k in keys else k for k in found}
+
+
+def sweep_orphans(apply: bool = False, retention_days: int = AUDIO_RETENTION_DAYS) -> tuple[int, int]:
+    """Remove files no assessment references once they are past the retention window
+    (measured from mtime, i.e. from when the file was superseded).
+
+    The filesystem is streamed and checked against the DB in batches. Returns
+    (files scanned, orphans found).
+    """
+    cutoff = time.time() - retention_days * 86400
+    scanned = orphans = 0
+
+    def check(batch: list[Path]) -> int:
+        referenced = _referenced(batch)
+        count = 0
+        for p in batch:
+            if str(p) in referenced:
+                continue
+            count += 1
+            logger.info("%s orphan %s", "Deleting" if apply else "Would delete", p)
+            if apply:
+                p.unlink(missing_ok=True)
+        return count
+
+    batch: list[Path] = []
+    for path in store.iter_files():
+        scanned += 1
+        try:
+            if path.stat().st_mtime > cutoff:
+                continue
+        except FileNotFoundError:
+            continue
+        batch.append(path)
+        if len(batch) >= _SWEEP_BATCH:
+            orphans += check(batch)
+            batch = []
+    if batch:
+        orphans += check(batch)
+    return scanned, orphans
+
+
+def missing_files() -> Iterator[tuple[int, str]]:
+    """DB rows whose recording is no longer on disk."""
+    db = SessionLocal()
+    try:
+        stmt = (
+            select(SpeechLanguage.assessment_id, SpeechLanguage.audio_path)
+            .where(SpeechLanguage.audio_path.is_not(None))
+            .execution_options(yield_per=1000)
+        )
+        for assessment_id, key in db.execute(stmt):
+            if not store.resolve(key).exists():
+                yield assessment_id, key
+    finally:
+        db.close()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(prog="python -m app.storage")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sweep = sub.add_parser("sweep", help="reconcile uploads/ with the database")
+    sweep.add_argument("--apply", action="store_true", help="actually delete orphaned files")
+    sweep.add_argument("--retention-days", type=int, default=AUDIO_RETENTION_DAYS)
+    args = parser.parse_args()
+
+    if args.command == "sweep":
+        started = datetime.utcnow()
+        scanned, orphans = sweep_orphans(apply=args.apply, retention_days=args.retention_days)
+        missing = sum(1 for _ in missing_files())
+        print(
+            f"Scanned {scanned} files, {orphans} orphaned{' (deleted)' if args.apply else ''}, "
+            f"{missing} DB rows missing their file, in {(datetime.utcnow() - started).total_seconds():.1f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
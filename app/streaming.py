@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import os
+import re
+from pathlib import Path
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+AUDIO_CONTENT_TYPES = {
+    ".wav": "audio/wav",
+    ".m4a": "audio/mp4",
+    ".aac": "audio/aac",
+    ".mp3": "audio/mpeg",
+    ".ogg": "audio/ogg",
+}
+
+CHUNK_SIZE = 256 * 1024
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def file_etag(stat: os.stat_result) -> str:
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None | bool:
+    """(start, end) inclusive for a single satisfiable range; None to send the whole
+    file (no/multi/invalid range); False if the range cannot be satisfied."""
+    if not header:
+        return None
+    m = _RANGE_RE.match(header.strip())
+    if not m:
+        return None
+    first, last = m.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes.
+        length = int(last)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+class RangeFileResponse(Response):
+    """Serve a file with single-range support without reading it into memory.
+
+    Uses the ASGI zero-copy send extension (sendfile) when the server offers
+    it; otherwise streams the requested span in pread() chunks from a worker
+    thread.
+    """
+
+    def __init__(self, path: Path, request_headers: Headers, media_type: str, stat: os.stat_result | None = None):
+        self.path = path
+        self.stat = stat or os.stat(path)
+        self.request_headers = request_headers
+        self.media_type = media_type
+        self.background = None
+
+        size = self.stat.st_size
+        etag = file_etag(self.stat)
+        base = {"accept-ranges": "bytes", "etag": etag, "cache-control": "private, max-age=3600"}
+
+        self.span: tuple[int, int] | None = None
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match and etag in {t.strip() for t in if_none_match.split(",")}:
+            self.status_code = 304
+            self.init_headers(base)
+            return
+
+        rng = parse_range(request_headers.get("range"), size)
+        if_range = request_headers.get("if-range")
+        if rng is not None and if_range is not None and if_range.strip() != etag:
+            rng = None  # client's copy is stale: send the full, current file
+
+        if rng is False:
+            self.status_code = 416
+            self.init_headers({**base, "content-range": f"bytes */{size}", "content-length": "0"})
+            return
+
+        if rng is None:
+            self.status_code = 200
+            self.span = (0, size - 1)
+            headers = {**base, "content-length": str(size)}
+        else:
+            self.status_code = 206
+            self.span = rng
+            headers = {**base, "content-range": f"bytes {rng[0]}-{rng[1]}/{size}", "content-length": str(rng[1] - rng[0] + 1)}
+        headers["content-type"] = media_type
+        self.init_headers(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+
+        if self.span is None or scope.get("method") == "HEAD" or self.stat.st_size == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        start, end = self.span
+        count = end - start + 1
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send({"type": "http.response.zerocopysend", "file": fd, "offset": start, "count": count})
+                return
+
+            offset = start
+            while count > 0:
+                chunk = await anyio.to_thread.run_sync(os.pread, fd, min(CHUNK_SIZE, count), offset)
+                if not chunk:
+                    break
+                offset += len(chunk)
+                count -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": count > 0})
+            if count > 0:
+                await send({"type": "http.response.body", "body": b""})
+        finally:
+            os.close(fd)
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from sqlalchemy import Engine, text
+
+from .db import engine
+
+# (entity name in the feed, table, SQL giving the row's center from `{row}`)
+SYNCED_TABLES = [
+    ("child", "children", "{row}.center_id"),
+    ("assessment", "assessments", "{row}.center_id"),
+    # Recommendations have no center column: take their assessment's.
+    ("recommendation", "recommendations", "(SELECT center_id FROM assessments WHERE id = {row}.assessment_id)"),
+]
+
+MAX_PAGE_SIZE = 5000
+
+
+def _triggers(entity: str, table: str, center: str) -> list[tuple[str, str]]:
+    new_center, old_center = center.format(row="new"), center.format(row="old")
+    return [
+        (
+            f"sync_{table}_ai",
+            f"""
+            CREATE TRIGGER sync_{table}_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO sync_changes(entity, entity_id, op, center_id)
+                VALUES ('{entity}', new.id, 'upsert', {new_center});
+            END
+            """,
+        ),
+        (
+            f"sync_{table}_au",
+            f"""
+            CREATE TRIGGER sync_{table}_au AFTER UPDATE ON {table} BEGIN
+                INSERT INTO sync_changes(entity, entity_id, op, center_id)
+                VALUES ('{entity}', new.id, 'upsert', {new_center});
+            END
+            """,
+        ),
+        (
+            f"sync_{table}_ad",
+            f"""
+            CREATE TRIGGER sync_{table}_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO sync_changes(entity, entity_id, op, center_id)
+                VALUES ('{entity}', old.id, 'delete', {old_center});
+            END
+            """,
+        ),
+    ]
+
+
+def init_change_log(engine: Engine) -> None:
+    with engine.begin() as conn:
+        for entity, table, center in SYNCED_TABLES:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = :name"),
+                {"name": f"sync_{table}_ai"},
+            ).first()
+            if not exists:
+                # Rows written before the triggers existed still need to reach devices.
+                conn.execute(
+                    text(
+                        f"INSERT INTO sync_changes(entity, entity_id, op, center_id) "
+                        f"SELECT '{entity}', id, 'upsert', {center.format(row=table)} FROM {table}"
+                    )
+                )
+            # Recreated on every start so existing databases pick up trigger changes.
+            for name, trigger in _triggers(entity, table, center):
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+                conn.execute(text(trigger))
+
+
+def compact_change_log(engine: Engine) -> int:
+    """Drop log entries superseded by a later entry for the same row.
+
+    Cursors stay valid: a device whose cursor is before a dropped entry still
+    receives the newer entry for the same row.
+    """
+    with engine.begin() as conn:
+        result = conn.execute(
+            text(
+                "DELETE FROM sync_changes WHERE id NOT IN "
+                "(SELECT MAX(id) FROM sync_changes GROUP BY entity, entity_id)"
+            )
+        )
+        return result.rowcount
+
+
+def main() -> None:
+    removed = compact_change_log(engine)
+    print(f"Removed {removed} superseded change-log entries")
+
+
+if __name__ == "__main__":
+    main()
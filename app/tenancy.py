@@ -0,0 +1,42 @@
+"""Request-scoped center (tenant) filtering.
+
+get_db puts the request's X-Center-Id into `session.info["center_id"]`.
+Every ORM SELECT on that session then only sees that center's children and
+assessments, and new rows without a center are stamped with it. Sessions
+without a center id (admin tools, CLIs) see everything.
+"""
+from __future__ import annotations
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session, with_loader_criteria
+
+from .models import Assessment, Child, TriageItem
+
+TENANT_MODELS = (Child, Assessment, TriageItem)
+
+
+def _scope_selects(state: ORMExecuteState) -> None:
+    center_id = state.session.info.get("center_id")
+    if center_id is None or not state.is_select or state.is_column_load or state.is_relationship_load:
+        return
+    state.statement = state.statement.options(
+        *(
+            with_loader_criteria(model, model.center_id == center_id, include_aliases=True)
+            for model in TENANT_MODELS
+        )
+    )
+
+
+def _stamp_new_rows(session: Session, flush_context, instances) -> None:
+    center_id = session.info.get("center_id")
+    if center_id is None:
+        return
+    for obj in session.new:
+        if isinstance(obj, TENANT_MODELS) and obj.center_id is None:
+            obj.center_id = center_id
+
+
+def install(*session_factories) -> None:
+    for factory in session_factories:
+        event.listen(factory, "do_orm_execute", _scope_selects)
+        event.listen(factory, "before_flush", _stamp_new_rows)
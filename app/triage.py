@@ -0,0 +1,184 @@
+"""Priority queue of at-risk assessments for referral staff.
+
+Entries are written when an assessment is completed as At risk. The queue
+order is (severity DESC, id) and is backed by an index, so taking the next
+item reads the first index entry instead of sorting every open row. Claims
+are a single conditional UPDATE, so two workers never get the same child.
+
+Rebuild entries for assessments completed before the queue existed:
+    python -m app.triage backfill
+"""
+from __future__ import annotations
+
+import argparse
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, exists, or_, select, update
+from sqlalchemy.orm import Session
+
+from .audit import journal
+from .db import SessionLocal
+from .models import Assessment, AssessmentStatus, Classification, TriageItem, TriageStatus
+from .rules import RuleSetError, registry
+from .scoring import DOMAINS
+
+# A claim not released or resolved within this time goes back to the queue.
+TRIAGE_CLAIM_TTL_MINUTES = int(os.environ.get("TRIAGE_CLAIM_TTL_MINUTES", "60"))
+# Added per domain below threshold on top of the point deficit, so several
+# moderate delays outrank one of the same total size.
+DOMAIN_POINTS = 25.0
+
+
+class TriageError(ValueError):
+    pass
+
+
+def severity(domain_scores: dict[str, int | None], thresholds: dict[str, int]) -> tuple[float, int]:
+    """(severity, number of domains below threshold) for one assessment."""
+    deficit = 0
+    below = 0
+    for domain, score in domain_scores.items():
+        if score is not None and score < thresholds[domain]:
+            deficit += thresholds[domain] - score
+            below += 1
+    return round(deficit + below * DOMAIN_POINTS, 2), below
+
+
+def _domain_scores(a: Assessment) -> dict[str, int | None]:
+    return {d: getattr(a, f"{d}_score") for d in DOMAINS}
+
+
+def update_for_assessment(db: Session, a: Assessment, thresholds: dict[str, int]) -> TriageItem | None:
+    """Queue (or re-queue) a freshly scored assessment; the caller commits."""
+    item = db.scalar(select(TriageItem).where(TriageItem.assessment_id == a.id))
+    if a.classification != Classification.at_risk:
+        if item is not None and item.status != TriageStatus.resolved:
+            db.delete(item)
+        return None
+
+    if item is None:
+        item = TriageItem(assessment_id=a.id, child_id=a.child_id, center_id=a.center_id)
+        db.add(item)
+    item.severity, item.domains_at_risk = severity(_domain_scores(a), thresholds)
+    item.status = TriageStatus.open
+    item.claimed_by = None
+    item.claimed_at = None
+    return item
+
+
+def requeue_expired(db: Session) -> int:
+    cutoff = datetime.utcnow() - timedelta(minutes=TRIAGE_CLAIM_TTL_MINUTES)
+    result = db.execute(
+        update(TriageItem)
+        .where(TriageItem.status == TriageStatus.claimed, TriageItem.claimed_at < cutoff)
+        .values(status=TriageStatus.open, claimed_by=None, claimed_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def claim_next(db: Session, actor: str, center_id: int | None = None) -> TriageItem | None:
+    requeue_expired(db)
+
+    head = select(TriageItem.id).where(TriageItem.status == TriageStatus.open)
+    if center_id is not None:
+        head = head.where(TriageItem.center_id == center_id)
+    head = head.order_by(TriageItem.severity.desc(), TriageItem.id).limit(1).scalar_subquery()
+
+    now = datetime.utcnow()
+    claimed_id = db.scalar(
+        update(TriageItem)
+        .where(TriageItem.id == head, TriageItem.status == TriageStatus.open)
+        .values(status=TriageStatus.claimed, claimed_by=actor, claimed_at=now, updated_at=now)
+        .returning(TriageItem.id)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    if claimed_id is None:
+        return None
+
+    item = db.get(TriageItem, claimed_id)
+    journal.record(item.assessment_id, "triage", [("status", "open", "claimed"), ("claimed_by", None, actor)], actor)
+    return item
+
+
+def _transition(db: Session, item_id: int, actor: str, status: TriageStatus) -> TriageItem:
+    item = db.get(TriageItem, item_id)
+    if item is None:
+        raise LookupError(item_id)
+    if item.status != TriageStatus.claimed or item.claimed_by != actor:
+        raise TriageError("Item is not claimed by you")
+
+    changes = [("status", TriageStatus.claimed.value, status.value)]
+    item.status = status
+    if status == TriageStatus.open:
+        changes.append(("claimed_by", actor, None))
+        item.claimed_by = None
+        item.claimed_at = None
+    db.commit()
+    journal.record(item.assessment_id, "triage", changes, actor)
+    db.refresh(item)
+    return item
+
+
+def release(db: Session, item_id: int, actor: str) -> TriageItem:
+    return _transition(db, item_id, actor, TriageStatus.open)
+
+
+def resolve(db: Session, item_id: int, actor: str) -> TriageItem:
+    return _transition(db, item_id, actor, TriageStatus.resolved)
+
+
+def list_items(
+    db: Session,
+    status: TriageStatus = TriageStatus.open,
+    limit: int = 50,
+    after: tuple[float, int] | None = None,
+) -> list[TriageItem]:
+    """One page in queue order; `after` is the (severity, id) of the previous page's last item."""
+    stmt = select(TriageItem).where(TriageItem.status == status)
+    if after is not None:
+        after_severity, after_id = after
+        stmt = stmt.where(
+            or_(
+                TriageItem.severity < after_severity,
+                and_(TriageItem.severity == after_severity, TriageItem.id > after_id),
+            )
+        )
+    return list(db.scalars(stmt.order_by(TriageItem.severity.desc(), TriageItem.id).limit(limit)))
+
+
+def backfill() -> int:
+    db = SessionLocal()
+    count = 0
+    try:
+        stmt = select(Assessment).where(
+            Assessment.status == AssessmentStatus.completed,
+            Assessment.classification == Classification.at_risk,
+            ~exists().where(TriageItem.assessment_id == Assessment.id),
+        )
+        for a in db.scalars(stmt).all():
+            try:
+                ruleset = registry.get(a.ruleset_version)
+            except RuleSetError:
+                ruleset = registry.get()
+            update_for_assessment(db, a, ruleset.risk_thresholds(a.child.age_months))
+            count += 1
+        db.commit()
+    finally:
+        db.close()
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.triage")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("backfill", help="queue completed at-risk assessments that have no entry yet")
+    args = parser.parse_args()
+    if args.command == "backfill":
+        print(f"Queued {backfill()} at-risk assessments")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def pytest_addoption(parser):
+    parser.addoption("--run-perf", action="store_true", help="run per-call time budget tests")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "perf: absolute time budgets; skipped unless --run-perf")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-perf"):
+        return
+    skip = pytest.mark.skip(reason="time budgets need --run-perf")
+    for item in items:
+        if "perf" in item.keywords:
+            item.add_marker(skip)
@@ -0,0 +1,284 @@
+"""Exhaustive and differential tests of app/scoring.py and the compiled rule set.
+
+The boolean input space of every score_* function is small enough to
+enumerate completely (speech sub-scores are taken over boundary values),
+so no property-based sampling is needed.
+"""
+from __future__ import annotations
+
+import inspect
+import itertools
+import json
+import os
+import random
+import statistics
+import time
+from types import SimpleNamespace
+from typing import Callable
+
+import pytest
+
+from app.models import Classification
+from app.rules import RULESETS_DIR, compile_ruleset, registry
+from app.scoring import (
+    DEFAULT_NORMS,
+    DOMAINS,
+    HIGH_POTENTIAL_DOMAINS,
+    AgeBandNorms,
+    classify,
+    composite_score,
+    flag_totals,
+    recommendations_for,
+    score_cognitive,
+    score_hearing,
+    score_motor,
+    score_speech,
+    score_vision,
+)
+
+SCORE_FUNCTIONS: dict[str, Callable] = {
+    "vision": score_vision,
+    "hearing": score_hearing,
+    "speech": score_speech,
+    "motor": score_motor,
+    "cognitive": score_cognitive,
+}
+
+# Items that lower a score; every other boolean must never lower it.
+PENALTIES = {
+    "vision": {"squints_or_close", "difficulty_shapes_colors", "avoids_visual_tasks"},
+    "hearing": {"delayed_response", "turns_one_ear", "asks_repetition"},
+    "motor": {"hand_dominance_unclear", "poor_balance", "weak_grip_coordination"},
+}
+
+SUB_SCORE_VALUES = (None, 0, 30, 59, 60, 84, 85, 100)
+BOUNDARY_SCORES = (0, 59, 60, 84, 85, 100)
+RANDOM_ASSESSMENTS = 5000
+
+# Median microseconds per call; scale with SCORING_BUDGET_SCALE on slow machines.
+TIME_BUDGETS_US = {
+    "score_vision": 15.0,
+    "score_hearing": 15.0,
+    "score_speech": 20.0,
+    "score_motor": 15.0,
+    "score_cognitive": 15.0,
+    "reference_pipeline": 80.0,
+    "ruleset_evaluate": 60.0,
+}
+BUDGET_SCALE = float(os.environ.get("SCORING_BUDGET_SCALE", "1.0"))
+# Always checked, machine-independent: compiled evaluate vs the reference pipeline
+# (about 0.6x when this was set).
+MAX_EVALUATE_TO_REFERENCE = 0.85
+
+# Synthetic bands whose thresholds and weights all differ from the defaults and
+# from each other, so every override path of the compiled bands is exercised.
+NORM_SETS = [
+    DEFAULT_NORMS,
+    AgeBandNorms(
+        band="lenient",
+        risk_threshold={"vision": 45, "hearing": 50, "speech": 40, "motor": 55, "cognitive": 50},
+        high_threshold={"vision": 85, "hearing": 85, "speech": 75, "motor": 80, "cognitive": 90},
+        weights={"vision": 0.30, "hearing": 0.10, "speech": 0.20, "motor": 0.15, "cognitive": 0.25},
+    ),
+    AgeBandNorms(
+        band="strict",
+        risk_threshold={"vision": 70, "hearing": 65, "speech": 75, "motor": 70, "cognitive": 72},
+        high_threshold={"vision": 85, "hearing": 85, "speech": 95, "motor": 92, "cognitive": 88},
+        weights={"vision": 0.10, "hearing": 0.20, "speech": 0.30, "motor": 0.25, "cognitive": 0.15},
+    ),
+]
+BANDED_AGE = 36
+
+
+def _params(domain: str) -> tuple[list[str], list[str]]:
+    """(boolean parameter names, integer sub-score names) of a score_* function."""
+    bools, subs = [], []
+    for name, p in inspect.signature(SCORE_FUNCTIONS[domain]).parameters.items():
+        (bools if p.annotation in ("bool", bool) else subs).append(name)
+    return bools, subs
+
+
+def enumerate_inputs(domain: str):
+    bools, subs = _params(domain)
+    for flags in itertools.product((False, True), repeat=len(bools)):
+        base = dict(zip(bools, flags))
+        for values in itertools.product(SUB_SCORE_VALUES, repeat=len(subs)):
+            yield {**base, **dict(zip(subs, values))}
+
+
+def reference_outcome(inputs: dict[str, dict], norms: AgeBandNorms):
+    """The pre-rule-set complete_assessment path, built from app/scoring.py."""
+    results = {d: SCORE_FUNCTIONS[d](**inputs[d]) for d in DOMAINS}
+    domain_scores = {d: results[d].score for d in DOMAINS}
+    if norms is DEFAULT_NORMS:
+        risk_total = sum(r.risk_flags for r in results.values())
+        high_total = sum(r.high_potential_flags for r in results.values())
+    else:
+        risk_total, high_total = flag_totals(domain_scores, norms)
+    composite = composite_score(**domain_scores, norms=norms)
+    classification = classify(
+        domain_scores=domain_scores, risk_flags_total=risk_total, high_flags_total=high_total, norms=norms
+    )
+    recs = recommendations_for(classification=classification, domain_scores=domain_scores, norms=norms)
+    return domain_scores, composite, classification, recs
+
+
+def _assessment(inputs: dict[str, dict]) -> SimpleNamespace:
+    return SimpleNamespace(**{d: SimpleNamespace(**inputs[d]) for d in DOMAINS})
+
+
+@pytest.fixture(scope="module")
+def ruleset():
+    return registry.get()
+
+
+def banded_ruleset(ruleset, norms: AgeBandNorms, lo: int = 0, hi: int = 72):
+    """The rule set with `norms` as its age band for lo..hi months."""
+    raw = json.loads((RULESETS_DIR / f"{ruleset.version}.json").read_text(encoding="utf-8"))
+    raw["age_bands"] = [
+        {
+            "band": norms.band,
+            "min_months": lo,
+            "max_months": hi,
+            "weights": dict(norms.weights),
+            "risk_below": dict(norms.risk_threshold),
+            "high_from": {d: norms.high_threshold[d] for d in HIGH_POTENTIAL_DOMAINS},
+        }
+    ]
+    return compile_ruleset(raw)
+
+
+@pytest.fixture(scope="module")
+def examples_by_score() -> dict[str, dict[int, dict]]:
+    """One input per reachable score, per domain."""
+    out: dict[str, dict[int, dict]] = {}
+    for domain, fn in SCORE_FUNCTIONS.items():
+        by_score: dict[int, dict] = {}
+        for kwargs in enumerate_inputs(domain):
+            by_score.setdefault(fn(**kwargs).score, kwargs)
+        out[domain] = by_score
+    return out
+
+
+@pytest.fixture(scope="module")
+def assessments(examples_by_score) -> list[dict[str, dict]]:
+    """Every combination of boundary scores across domains, plus seeded random ones."""
+    def nearest(domain: str, target: int) -> dict:
+        scores = examples_by_score[domain]
+        return scores[min(scores, key=lambda s: (abs(s - target), s))]
+
+    combos = [
+        {d: nearest(d, t) for d, t in zip(DOMAINS, targets)}
+        for targets in itertools.product(BOUNDARY_SCORES, repeat=len(DOMAINS))
+    ]
+    rng = random.Random(0)
+    pools = {d: list(examples_by_score[d].values()) for d in DOMAINS}
+    combos += [{d: rng.choice(pools[d]) for d in DOMAINS} for _ in range(RANDOM_ASSESSMENTS)]
+    return combos
+
+
+@pytest.mark.parametrize("domain", DOMAINS)
+def test_scores_in_range_with_consistent_flags(domain):
+    fn = SCORE_FUNCTIONS[domain]
+    for kwargs in enumerate_inputs(domain):
+        res = fn(**kwargs)
+        assert 0 <= res.score <= 100, kwargs
+        assert res.risk_flags == (1 if res.score < 60 else 0), kwargs
+        expected_high = (1 if res.score >= 85 else 0) if domain in HIGH_POTENTIAL_DOMAINS else 0
+        assert res.high_potential_flags == expected_high, kwargs
+
+
+@pytest.mark.parametrize("domain", DOMAINS)
+def test_scores_are_monotonic(domain):
+    fn = SCORE_FUNCTIONS[domain]
+    bools, subs = _params(domain)
+    penalties = PENALTIES.get(domain, set())
+    scores = {tuple(kw[k] for k in bools + subs): fn(**kw).score for kw in enumerate_inputs(domain)}
+
+    def score_of(kwargs: dict) -> int:
+        return scores[tuple(kwargs[k] for k in bools + subs)]
+
+    for kwargs in enumerate_inputs(domain):
+        s = score_of(kwargs)
+        for name in bools:
+            if kwargs[name]:
+                continue
+            flipped = score_of({**kwargs, name: True})
+            if name in penalties:
+                assert flipped <= s, f"penalty {name} raised the score for {kwargs}"
+            else:
+                assert flipped >= s, f"{name} lowered the score for {kwargs}"
+        for name in subs:
+            v = kwargs[name]
+            if v is None or v == SUB_SCORE_VALUES[-1]:
+                continue
+            higher = SUB_SCORE_VALUES[SUB_SCORE_VALUES.index(v) + 1]
+            assert score_of({**kwargs, name: higher}) >= s, f"raising {name} lowered the score for {kwargs}"
+
+
+@pytest.mark.parametrize("domain", DOMAINS)
+def test_ruleset_domain_score_matches_reference(domain, ruleset):
+    fn = SCORE_FUNCTIONS[domain]
+    compiled = next(d for d in ruleset.domains if d.name == domain)
+    for kwargs in enumerate_inputs(domain):
+        assert ruleset.score_domain(compiled, SimpleNamespace(**kwargs)) == fn(**kwargs).score, kwargs
+
+
+@pytest.mark.parametrize("norms", NORM_SETS, ids=lambda n: n.band)
+def test_ruleset_evaluate_matches_reference(norms, ruleset, assessments):
+    if norms is not DEFAULT_NORMS:
+        ruleset = banded_ruleset(ruleset, norms)
+    for inputs in assessments:
+        scores, composite, classification, recs = reference_outcome(inputs, norms)
+        outcome = ruleset.evaluate(_assessment(inputs), BANDED_AGE)
+        assert outcome.scores_by_domain() == scores
+        assert (outcome.composite_score, outcome.classification) == (composite, classification), scores
+        assert [r.as_dict() for r in outcome.recommendations] == recs, scores
+        if any(scores[d] < norms.risk_threshold[d] for d in DOMAINS):
+            assert classification == Classification.at_risk, scores
+
+
+def test_age_band_applies_only_within_its_months(ruleset, assessments):
+    strict = AgeBandNorms(band="strict", risk_threshold={d: 80 for d in DOMAINS})
+    banded = banded_ruleset(ruleset, strict, lo=24, hi=35)
+    inputs = _assessment(assessments[0])
+    assert banded.evaluate(inputs, 23) == ruleset.evaluate(inputs)
+    assert banded.evaluate(inputs, 36) == ruleset.evaluate(inputs)
+    assert banded.risk_thresholds(30) == {d: 80 for d in DOMAINS}
+    assert banded.risk_thresholds(None) == ruleset.risk_thresholds()
+
+
+def _median_us(fn: Callable, args_list: list, repeat: int = 5) -> float:
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for args in args_list:
+            fn(*args)
+        runs.append((time.perf_counter() - start) / len(args_list) * 1e6)
+    return statistics.median(runs)
+
+
+def test_evaluate_faster_than_reference(ruleset, assessments):
+    sample = assessments[:2000]
+    reference = [(c, DEFAULT_NORMS) for c in sample]
+    compiled = [(_assessment(c),) for c in sample]
+    ratios = [_median_us(ruleset.evaluate, compiled) / _median_us(reference_outcome, reference) for _ in range(3)]
+    ratio = statistics.median(ratios)
+    assert ratio <= MAX_EVALUATE_TO_REFERENCE, f"evaluate takes {ratio:.2f}x the reference pipeline"
+
+
+@pytest.mark.perf
+@pytest.mark.parametrize("path", sorted(TIME_BUDGETS_US))
+def test_time_budget(path, ruleset, assessments):
+    sample = assessments[:2000]
+    if path in {f.__name__ for f in SCORE_FUNCTIONS.values()}:
+        domain = path.removeprefix("score_")
+        fn = SCORE_FUNCTIONS[domain]
+        inputs = list(itertools.islice(enumerate_inputs(domain), 2000))
+        us = _median_us(lambda kw: fn(**kw), [(kw,) for kw in inputs])
+    elif path == "reference_pipeline":
+        us = _median_us(reference_outcome, [(c, DEFAULT_NORMS) for c in sample])
+    else:
+        us = _median_us(ruleset.evaluate, [(_assessment(c),) for c in sample])
+    budget = TIME_BUDGETS_US[path] * BUDGET_SCALE
+    assert us <= budget, f"{path}: {us:.2f} us/call over the {budget:.1f} us budget"